@@ -0,0 +1,43 @@
+"""Evaluation cost of computing several metrics with ``evaluation.evaluate``
+(one inference per method) versus one inference per metric.
+
+Usage: python benchmarks/bench_evaluation.py [samples] [repeat]
+"""
+
+import sys
+import timeit
+
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import (accuracy_score, f1_score, log_loss,
+                             precision_score, recall_score, roc_auc_score)
+
+from mlsconverters.evaluation import evaluate
+
+LABEL_METRICS = (accuracy_score, f1_score, precision_score, recall_score)
+SCORE_METRICS = (roc_auc_score, log_loss)
+
+
+def _per_metric(model, X, y):
+    results = [f(y, model.predict(X)) for f in LABEL_METRICS]
+    return results + [f(y, model.predict_proba(X)[:, 1]) for f in SCORE_METRICS]
+
+
+def main(samples=50000, repeat=5):
+    X, y = make_classification(n_samples=samples, random_state=0)
+    model = RandomForestClassifier(n_estimators=50, random_state=0).fit(X, y)
+    metrics = LABEL_METRICS + SCORE_METRICS
+    cases = {
+        "per metric": lambda: _per_metric(model, X, y),
+        "evaluate": lambda: evaluate(model, X, y, metrics),
+        "evaluate chunked": lambda: evaluate(model, X, y, metrics, chunksize=10000),
+    }
+    timings = {}
+    for name, func in cases.items():
+        timings[name] = timeit.timeit(func, number=repeat) / repeat
+        print("{:>16}: {:8.1f} ms".format(name, timings[name] * 1e3))
+    print("speedup: {:.2f}x".format(timings["per metric"] / timings["evaluate"]))
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,47 @@
+"""Size and write/read throughput of a run with many metric points in every
+MLS format, plain and with compact IRIs.
+
+Usage: python benchmarks/bench_formats.py [points] [repeat]
+"""
+
+import sys
+import timeit
+
+from mlsconverters import formats
+from mlsconverters.metrics import MetricLog
+from mlsconverters.models import Run
+
+
+def main(points=20000, repeat=5):
+    log = MetricLog()
+    for step in range(points):
+        log.log({"loss": 1.0 / (step + 1), "accuracy": step / points}, step)
+    run = Run(1, output_values=log.evaluations(1))
+
+    for fmt in formats.FORMATS:
+        for compact in (False, True):
+            try:
+                data = formats.dumps(run, fmt, compact)
+            except ImportError:
+                continue
+            write = min(
+                timeit.repeat(
+                    lambda: formats.dumps(run, fmt, compact), number=1, repeat=repeat
+                )
+            )
+            read = min(
+                timeit.repeat(lambda: formats.loads(data, fmt), number=1, repeat=repeat)
+            )
+            print(
+                "{:>10}{:>9}: {:8.1f} KiB  write {:6.1f} ms  read {:6.1f} ms".format(
+                    fmt,
+                    " compact" if compact else "",
+                    len(data) / 2 ** 10,
+                    write * 1000,
+                    read * 1000,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
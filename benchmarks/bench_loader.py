@@ -0,0 +1,58 @@
+"""Time to read back many exported documents: materializing every run with
+``RunDocument.to_run`` versus the ``loader.extract`` fast path reading one
+hyperparameter and one metric.
+
+Usage: python benchmarks/bench_loader.py [documents] [points]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mlsconverters import loader, serializer
+from mlsconverters.runlog import events_to_run, metric_event
+
+
+def _run(index, points):
+    events = [
+        {"event": "run", "id": str(index), "algorithm": "mls#SVC"},
+        {
+            "event": "implementation",
+            "id": "impl",
+            "algorithm": None,
+            "version": "1.0",
+            "name": None,
+        },
+    ]
+    events += [
+        {"event": "param", "name": "p{}".format(i), "value": i} for i in range(30)
+    ]
+    events += [metric_event("loss", 1.0 / (s + 1), s) for s in range(points)]
+    return events_to_run(events)
+
+
+def main(documents=2000, points=20):
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for index in range(documents):
+            path = Path(directory) / "{}.jsonld".format(index)
+            path.write_text(serializer.dumps(_run(index, points)))
+            paths.append(path)
+
+        start = time.perf_counter()
+        for path in paths:
+            loader.load(path).to_run()
+        full = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for path in paths:
+            loader.extract(path, ["p3"], ["loss"])
+        fast = time.perf_counter() - start
+
+    print("to_run : {:8.0f} documents/s".format(documents / full))
+    print("extract: {:8.0f} documents/s".format(documents / fast))
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,108 @@
+"""Peak memory of building and holding a batch of runs, with the
+``__slots__`` model classes versus the previous dict-backed ones.
+
+Usage: python benchmarks/bench_models_memory.py [runs] [params]
+"""
+
+import sys
+import tracemalloc
+
+from mlsconverters import models
+
+
+class _HyperParameter:
+    def __init__(self, _id, model_hash):
+        self._id = "http://www.w3.org/ns/mls#HyperParameter.{}.{}".format(
+            _id, model_hash
+        )
+        self.label = _id
+
+
+class _HyperParameterSetting:
+    def __init__(self, value, specified_by, model_hash):
+        self._id = "http://www.w3.org/ns/mls#HyperParameterSetting.{}.{}".format(
+            specified_by.label, model_hash
+        )
+        self.value = value
+        self.specified_by = specified_by
+
+
+class _Algorithm:
+    def __init__(self, _id):
+        self._id = _id
+        self.label = _id
+
+
+class _Implementation:
+    def __init__(self, _id, parameters, implements=None, version=None, name=None):
+        self._id = _id
+        self.name = name
+        self.parameters = parameters
+        self.implements = implements
+        self.version = version
+
+
+class _Run:
+    def __init__(self, _id, executes=None, input_values=None, output_values=None):
+        self._id = _id
+        self.executes = executes
+        self.input_values = input_values
+        self.output_values = output_values
+        self.realizes = None
+        self.version = None
+        self.name = None
+
+
+LEGACY = (_HyperParameter, _HyperParameterSetting, _Algorithm, _Implementation, _Run)
+COMPACT = (
+    models.HyperParameter,
+    models.HyperParameterSetting,
+    models.Algorithm,
+    models.Implementation,
+    models.Run,
+)
+
+
+def _build(classes, runs, params):
+    hp_class, setting_class, algo_class, impl_class, run_class = classes
+    batch = []
+    for run_id in range(runs):
+        # labels come from get_params() dict keys, fresh strings per model
+        labels = ["param_{}".format(i) for i in range(params)]
+        hps = [hp_class(label, model_hash=run_id) for label in labels]
+        settings = [
+            setting_class(float(i), hp, model_hash=run_id) for i, hp in enumerate(hps)
+        ]
+        algo = algo_class("sklearn.linear_model.SGDClassifier")
+        batch.append(
+            run_class(
+                run_id,
+                executes=impl_class(
+                    "sklearn.linear_model.SGDClassifier", hps, implements=algo
+                ),
+                input_values=settings,
+                output_values=[],
+            )
+        )
+    return batch
+
+
+def _peak(classes, runs, params):
+    tracemalloc.start()
+    batch = _build(classes, runs, params)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del batch
+    return peak
+
+
+def main(runs=2000, params=50):
+    legacy = _peak(LEGACY, runs, params)
+    compact = _peak(COMPACT, runs, params)
+    print("dict-backed: {:8.1f} MiB".format(legacy / 2**20))
+    print("     slots: {:8.1f} MiB".format(compact / 2**20))
+    print("reduction: {:.1f}%".format(100 * (1 - compact / legacy)))
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
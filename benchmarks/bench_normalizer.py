@@ -0,0 +1,78 @@
+"""Parameter conversion cost of the type-dispatch normalizer versus the
+previous trial ``json.dumps`` of every leaf, over the tests/test_model.py
+models.
+
+Usage: python benchmarks/bench_normalizer.py [repeat]
+"""
+
+import importlib
+import json
+import os
+import sys
+import timeit
+
+import numpy as np
+from scipy.stats._distn_infrastructure import rv_frozen
+
+from mlsconverters.common import deep_get_params, normalize_float
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+from test_model import test_to_mls  # noqa: E402
+
+MODELS = [
+    mark.values[0] if hasattr(mark, "values") else mark
+    for mark in test_to_mls.pytestmark[0].args[1]
+]
+
+
+def _legacy_deep_get_params(params):
+    def standardize_types(v):
+        if isinstance(v, np.ndarray):
+            return [normalize_float(x) for x in v.tolist()]
+        elif isinstance(v, float):
+            return normalize_float(v)
+        elif callable(v):
+            return str(v)
+        elif isinstance(v, rv_frozen):
+            return {"dist_name": v.dist.name, "args": v.args, "kwds": v.kwds}
+        return v
+
+    def convert(params):
+        if isinstance(params, (list, tuple)):
+            return [convert(x) for x in params]
+        elif isinstance(params, dict):
+            return {k: convert(v) for k, v in params.items()}
+        v = standardize_types(params)
+        try:
+            p = v.get_params()
+            t = type(v).__module__ + "." + type(v).__name__
+            return {"@value": {"type": t, "params": convert(p)}}
+        except AttributeError:
+            json.dumps(v)
+            return v
+
+    return convert(params)
+
+
+def main(repeat=200):
+    # registers the rv_frozen normalizer
+    importlib.import_module("mlsconverters.sklearn")
+
+    params = [m.get_params() for m in MODELS]
+    cases = {
+        "trial json.dumps": lambda: [_legacy_deep_get_params(p) for p in params],
+        "type dispatch": lambda: [deep_get_params(p, None) for p in params],
+    }
+    timings = {}
+    for name, func in cases.items():
+        timings[name] = timeit.timeit(func, number=repeat) / repeat
+        print("{:>18}: {:8.1f} us/batch".format(name, timings[name] * 1e6))
+    print(
+        "speedup: {:.2f}x".format(
+            timings["trial json.dumps"] / timings["type dispatch"]
+        )
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,46 @@
+"""Scaling of export_many_to_dir with the number of worker processes.
+
+Usage: python benchmarks/bench_parallel.py [n_models] [max_workers]
+"""
+
+import os
+import sys
+import tempfile
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from mlsconverters import export_many_to_dir
+
+
+def _models(n):
+    for i in range(n):
+        if i % 2:
+            yield RandomForestClassifier(n_estimators=10 + i % 50, max_depth=i % 7 + 1)
+        else:
+            yield Pipeline(
+                [("scale", StandardScaler()), ("clf", LogisticRegression(C=i + 1.0))]
+            )
+
+
+def main(n_models=10000, max_workers=os.cpu_count()):
+    baseline = None
+    workers = 1
+    while workers <= max_workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            summary = export_many_to_dir(
+                _models(n_models), tmp, workers=workers, chunksize=64
+            )
+        baseline = baseline or summary.models_per_second
+        print(
+            "workers={:>3}: {:9.1f} models/s, scaling {:.2f}x".format(
+                workers, summary.models_per_second, summary.models_per_second / baseline
+            )
+        )
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
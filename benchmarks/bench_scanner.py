@@ -0,0 +1,65 @@
+"""Reading back a directory of exported runs: a plain ``json.load`` loop
+versus ``scanner.scan`` cold (parse and index every file) and warm (all
+files unchanged).
+
+Usage: python benchmarks/bench_scanner.py [documents] [workers]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mlsconverters import scanner, serializer
+from mlsconverters.runlog import events_to_run, metric_event
+
+
+def _run(index):
+    events = [
+        {"event": "run", "id": str(index), "algorithm": "SGD"},
+        {
+            "event": "implementation",
+            "id": "impl",
+            "algorithm": None,
+            "version": "1.0",
+            "name": None,
+        },
+    ]
+    events += [
+        {"event": "param", "name": "p{}".format(i), "value": index % (i + 2)}
+        for i in range(20)
+    ]
+    events += [metric_event("accuracy", index % 100 / 100.0)]
+    return events_to_run(events)
+
+
+def main(documents=20000, workers=None):
+    with tempfile.TemporaryDirectory() as directory:
+        for index in range(documents):
+            Path(directory, "{}.jsonld".format(index)).write_text(
+                serializer.dumps(_run(index))
+            )
+
+        start = time.perf_counter()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                with open(entry.path) as f:
+                    json.load(f)
+        seconds = time.perf_counter() - start
+        print("json.load loop: {:8.0f} files/s".format(documents / seconds))
+
+        for name in ("scan cold", "scan warm"):
+            start = time.perf_counter()
+            columns, summary = scanner.scan(directory, workers=workers)
+            seconds = time.perf_counter() - start
+            print(
+                "{:>14}: {:8.0f} files/s, {} columns, {}".format(
+                    name, documents / seconds, len(columns), summary
+                )
+            )
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,29 @@
+"""Per-export schema setup cost with and without the shared schema registry.
+
+Usage: python benchmarks/bench_schema_registry.py [repeat]
+"""
+import sys
+import timeit
+
+from sklearn.linear_model import LogisticRegression
+
+from mlsconverters.models import RunSchema, clear_schema_registry, get_schema
+from mlsconverters.sklearn import to_run
+
+
+def main(repeat=2000):
+    run = to_run(LogisticRegression())
+    clear_schema_registry()
+    cases = {
+        "setup, fresh RunSchema()": lambda: RunSchema(),
+        "setup, get_schema(RunSchema)": lambda: get_schema(RunSchema),
+        "dumps, fresh RunSchema()": lambda: RunSchema().dumps(run),
+        "dumps, get_schema(RunSchema)": lambda: get_schema(RunSchema).dumps(run),
+    }
+    for name, func in cases.items():
+        seconds = timeit.timeit(func, number=repeat)
+        print("{:>30}: {:8.1f} us/export".format(name, seconds / repeat * 1e6))
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,41 @@
+"""Compare the calamus and compiled serializer engines on a ~40 parameter run.
+
+Usage: python benchmarks/bench_serializer.py [repeat]
+"""
+import sys
+import timeit
+
+from sklearn.decomposition import PCA
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from mlsconverters import serializer
+from mlsconverters.sklearn import to_run
+
+
+def main(repeat=2000):
+    model = Pipeline(
+        [("scale", StandardScaler()), ("pca", PCA()), ("clf", SGDClassifier())]
+    )
+    run = to_run(model)
+    assert serializer.dumps(run, engine="compiled") == serializer.dumps(
+        run, engine="calamus"
+    )
+    print("hyperparameters: {}".format(len(run.executes.parameters)))
+    timings = {}
+    for engine in serializer.ENGINES:
+        seconds = timeit.timeit(
+            lambda: serializer.dumps(run, engine=engine), number=repeat
+        )
+        timings[engine] = seconds
+        print("{:>10}: {:8.1f} us/run".format(engine, seconds / repeat * 1e6))
+    print(
+        "speedup: {:.1f}x".format(
+            timings[serializer.ENGINE_CALAMUS] / timings[serializer.ENGINE_COMPILED]
+        )
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,47 @@
+"""Throughput and memory of ``Session.log_metrics`` versus ``Session.metric``.
+
+Usage: python benchmarks/bench_session_metrics.py [points]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from mlsconverters import Session
+
+
+def _measure(log, points):
+    tracemalloc.start()
+    start = time.perf_counter()
+    log(points)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return points / elapsed * 60, size / points
+
+
+def main(points=1000000):
+    session = Session("bench")
+
+    def log_metrics(n):
+        for step in range(n):
+            session.log_metrics({"loss": 1.0 / (step + 1)})
+
+    def metric(n):
+        for step in range(n):
+            session.metric("loss", 1.0 / (step + 1))
+
+    for name, log, n in (
+        ("log_metrics", log_metrics, points),
+        ("metric", metric, points // 10),
+    ):
+        per_minute, per_point = _measure(log, n)
+        print(
+            "{:>12}: {:12.0f} points/min {:8.1f} bytes/point".format(
+                name, per_minute, per_point
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,96 @@
+"""Query latency of a ``store.RunStore`` indexing many runs, e.g. "runs of
+RandomForest with max_depth > 5 and accuracy > 0.9, best 10 first".
+
+Usage: python benchmarks/bench_store.py [runs] [repeat]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mlsconverters import loader
+from mlsconverters.store import RunStore
+
+ALGORITHMS = ("RandomForestClassifier", "SVC", "LogisticRegression", "SGD")
+
+
+def _document(index, rng):
+    return {
+        "@id": str(index),
+        loader.IMPLEMENTS: {loader.LABEL: rng.choice(ALGORITHMS)},
+        loader.EXECUTES: {loader.HAS_VERSION: rng.choice(("1.0", "1.1"))},
+        loader.HAS_INPUT: [
+            {
+                loader.SPECIFIED_BY: {
+                    loader.ID: "{}HyperParameter.{}.{}".format(loader.MLS, name, index)
+                },
+                loader.HAS_VALUE: {"@value": value},
+            }
+            for name, value in (
+                ("max_depth", rng.randint(1, 20)),
+                ("criterion", rng.choice(("gini", "entropy"))),
+                ("lr", rng.random()),
+            )
+        ],
+        loader.HAS_OUTPUT: [
+            {
+                loader.SPECIFIED_BY: {loader.ID: loader.MLS + name},
+                loader.HAS_VALUE: rng.random(),
+            }
+            for name in ("accuracy", "F1")
+        ],
+    }
+
+
+def _time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(runs=100000, repeat=5):
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        store = RunStore(Path(directory) / "runs.sqlite")
+        start = time.perf_counter()
+        store.index_documents(
+            ("{}.jsonld".format(i), _document(i, rng), None) for i in range(runs)
+        )
+        print(
+            "indexed {} runs: {:.0f} runs/s".format(
+                runs, runs / (time.perf_counter() - start)
+            )
+        )
+        queries = {
+            "filter": lambda: store.query(
+                algorithm="RandomForestClassifier",
+                params={"max_depth": (">", 5)},
+                metrics={"accuracy": (">", 0.9)},
+            ),
+            "filter top-10": lambda: store.query(
+                algorithm="RandomForestClassifier",
+                params={"max_depth": (">", 5)},
+                metrics={"accuracy": (">", 0.9)},
+                order_by="accuracy",
+                limit=10,
+            ),
+            "top-10": lambda: store.query(order_by="F1", limit=10),
+            "text param": lambda: store.query(
+                params={"criterion": "entropy", "lr": ("<", 0.01)}
+            ),
+        }
+        for name, query in queries.items():
+            seconds, result = _time(query, repeat)
+            print(
+                "{:>14}: {:7.2f} ms, {} runs".format(name, seconds * 1000, len(result))
+            )
+        store.close()
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,45 @@
+"""Peak memory of writing a run with a long metric series through
+``serializer.dump_to`` (nodes created while streaming) versus building the
+whole document with ``serializer.dumps`` first.
+
+Usage: python benchmarks/bench_streaming.py [points]
+"""
+
+import os
+import sys
+import tracemalloc
+
+from mlsconverters import serializer
+from mlsconverters.metrics import MetricLog
+from mlsconverters.models import Run
+
+
+def _peak(write):
+    tracemalloc.start()
+    write()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main(points=200000):
+    log = MetricLog()
+    for step in range(points):
+        log.log({"loss": 1.0 / (step + 1)}, step)
+
+    def dumps():
+        run = Run(1, output_values=log.evaluations(1))
+        with open(os.devnull, "w") as f:
+            f.write(serializer.dumps(run, engine=serializer.ENGINE_COMPILED))
+
+    def stream():
+        run = Run(1, output_values=log.iter_evaluations(1))
+        with open(os.devnull, "w") as f:
+            serializer.dump_to(run, f)
+
+    for name, write in (("dumps", dumps), ("dump_to", stream)):
+        print("{:>8}: {:8.1f} MiB peak".format(name, _peak(write) / 2 ** 20))
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -1,32 +1,298 @@
 from __future__ import absolute_import, print_function
 
-import os
+import importlib
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
 from . import io
 from .decorators import params
-from .session import Session
+from .registry import get_converter, register_converter
+
+__all__ = [
+    "ExportSummary",
+    "Session",
+    "export",
+    "export_many",
+    "export_many_to_dir",
+    "export_to_file",
+    "generate_unique_id",
+    "io",
+    "params",
+    "register_converter",
+]
+
+EXECUTORS = ("process", "thread")
+
+# imported on first access, they pull in numpy and calamus
+_LAZY_ATTRIBUTES = {"Session": ".session", "generate_unique_id": ".common"}
+_LAZY_SUBMODULES = (
+    "arrays",
+    "cache",
+    "common",
+    "formats",
+    "loader",
+    "metrics",
+    "models",
+    "runlog",
+    "scanner",
+    "serializer",
+    "session",
+    "store",
+)
+
+
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module("." + name, __name__)
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    globals()[name] = value
+    return value
 
 
 def _extract_mls(model, **kwargs):
-    if model.__module__.startswith("sklearn"):
-        from . import sklearn
+    return get_converter(model).to_mls(model, **kwargs)
+
+
+def _extract_run(model, **kwargs):
+    return get_converter(model).to_run(model, **kwargs)
+
+
+def export_to_file(model, filename, compact=False, **kwargs):
+    """Export ``model`` to ``filename``, streaming the document to it.
+
+    The format follows the suffix of ``filename``, e.g. ``.jsonld.gz`` or
+    ``.msgpack``, see ``formats.format_of``.
+    """
+    from . import formats
+
+    run = get_converter(model).to_run(model, **kwargs)
+    with open(filename, "wb") as f:
+        formats.write(run, f, formats.format_of(filename), compact)
+
+
+def export(
+    model,
+    force=False,
+    sidecar_threshold=None,
+    cache=False,
+    evaluation=None,
+    metrics=None,
+    chunksize=None,
+    **kwargs
+):
+    """Export ``model`` to the renku project, return the document path.
+
+    The document is streamed to disk, see ``io.log_renku_run``.
+
+    With ``evaluation=(X_test, y_test)`` the ``metrics`` of the model on that
+    test set are exported as ``ModelEvaluation`` outputs, predicting at most
+    once per inference method and ``chunksize`` rows at a time, see
+    ``evaluation.evaluate``.
+    With ``cache`` a model whose content was exported before, in this or an
+    earlier process, is not converted again and the path of the existing
+    document is returned, see ``cache.ExportCache``.
+    """
+    if evaluation is not None:
+        if not metrics:
+            raise ValueError("evaluation requires metrics")
+        if io.renku_mls_path(force) is None:
+            return None
+        from .evaluation import evaluate
+
+        X, y = evaluation
+        kwargs["evaluations"] = evaluate(model, X, y, metrics, chunksize)
+
+    if cache:
+        from .cache import export_digest, get_export_cache
+
+        path = io.renku_mls_path(force)
+        if path is None:
+            return None
+        export_cache = get_export_cache(path)
+        digest = export_digest(model, sidecar_threshold=sidecar_threshold, **kwargs)
+        existing = export_cache.get(digest)
+        if existing is not None:
+            return existing
+        # named by the digest, the model may be mutated and exported again
+        document = _export(model, force, sidecar_threshold, kwargs, name=digest)
+        export_cache.put(digest, document)
+        return document
+
+    return _export(model, force, sidecar_threshold, kwargs)
+
+
+def _export(model, force, sidecar_threshold, kwargs, name=None):
+    from .common import model_id
+
+    # arrays go next to the document, so resolve the project first
+    path = io.renku_mls_path(force)
+    if path is None:
+        return None
+    model_hash = model_id(model)
+    if name is None:
+        name = str(model_hash)
+    if sidecar_threshold is not None:
+        path.mkdir(parents=True, exist_ok=True)
+        kwargs["array_policy"] = io.sidecar_array_policy(path, sidecar_threshold)
+    run = _extract_run(model, model_hash=model_hash, **kwargs)
+    return io.log_renku_run(run, name, force)
 
-        return sklearn.to_mls(model, **kwargs)
-    elif model.__module__.startswith("xgboost"):
-        from . import xgboost
 
-        return xgboost.to_mls(model, **kwargs)
+class ExportSummary:
+    """Outcome of a batch export."""
+
+    def __init__(self, paths, count, seconds):
+        self.paths = paths
+        self.count = count
+        self.seconds = seconds
+
+    @property
+    def models_per_second(self):
+        return self.count / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return (
+            "ExportSummary(count={}, seconds={:.3f}, models_per_second={:.1f})".format(
+                self.count, self.seconds, self.models_per_second
+            )
+        )
+
+
+def _iter_jobs(models, kwargs):
+    """Yield ``(model_hash, model, kwargs)`` for each model.
+
+    Items of ``models`` are either models or ``(model, kwargs)`` pairs, the
+    latter overriding the batch wide ``kwargs`` for that model.
+    """
+    from .common import model_id
+
+    for item in models:
+        if isinstance(item, tuple):
+            model, model_kwargs = item
+            model_kwargs = dict(kwargs, **model_kwargs)
+        else:
+            model, model_kwargs = item, kwargs
+        yield model_id(model), model, model_kwargs
+
+
+def _convert(job):
+    # the hash is taken in the parent, unpickled copies hash differently
+    model_hash, model, kwargs = job
+    return str(model_hash), _extract_mls(model, model_hash=model_hash, **kwargs)
+
+
+def _iter_mls(models, kwargs, workers=None, executor="process", chunksize=16):
+    """Yield ``(hash, mls)`` for each model, in order.
+
+    With ``workers`` set the conversion runs on a process or thread pool.
+    """
+    if executor not in EXECUTORS:
+        raise ValueError("unknown executor {}".format(executor))
+    if not workers or workers == 1:
+        for job in _iter_jobs(models, kwargs):
+            yield _convert(job)
+        return
+
+    from . import serializer
+
+    # workers may not share our serializer settings
+    kwargs = dict(kwargs)
+    kwargs.setdefault("engine", serializer.get_engine())
+    pool_class = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    with pool_class(max_workers=workers) as pool:
+        for result in pool.map(
+            _convert, _iter_jobs(models, kwargs), chunksize=chunksize
+        ):
+            yield result
+
+
+def _graph_document(documents):
+    return '{"@graph": [' + ", ".join(documents) + "]}"
+
+
+def _export_many_to_path(
+    models, path, graph, graph_name, sidecar_threshold, pool_options, kwargs
+):
+    start = time.perf_counter()
+    path.mkdir(parents=True, exist_ok=True)
+    if sidecar_threshold is not None:
+        kwargs = dict(
+            kwargs, array_policy=io.sidecar_array_policy(path, sidecar_threshold)
+        )
+    paths = []
+    count = 0
+    if graph:
+        hashes, documents = [], []
+        for hash, mls in _iter_mls(models, kwargs, **pool_options):
+            hashes.append(hash)
+            documents.append(mls)
+        count = len(documents)
+        if graph_name is None:
+            from .common import generate_unique_id
+
+            graph_name = generate_unique_id("batch", content=hashes)
+        paths.append(io.write_mls(path, _graph_document(documents), graph_name))
     else:
-        raise ValueError("Unsupported library")
+        for hash, mls in _iter_mls(models, kwargs, **pool_options):
+            paths.append(io.write_mls(path, mls, hash))
+            count += 1
+    return ExportSummary(paths, count, time.perf_counter() - start)
+
+
+def export_many_to_dir(
+    models,
+    dirpath,
+    graph=False,
+    graph_name=None,
+    sidecar_threshold=None,
+    workers=None,
+    executor="process",
+    chunksize=16,
+    **kwargs
+):
+    """Export ``models`` to ``dirpath``.
 
+    Writes one ``<hash>.jsonld`` file per model, or a single JSON-LD
+    ``@graph`` document named ``<graph_name>.jsonld`` if ``graph`` is set.
+    Arrays with more than ``sidecar_threshold`` elements are stored once as
+    content-addressed ``.npy`` files next to the documents.
+    With ``workers`` > 1 models are converted in parallel on a ``"process"``
+    or ``"thread"`` pool, results are still written in input order.
+    """
+    pool_options = dict(workers=workers, executor=executor, chunksize=chunksize)
+    return _export_many_to_path(
+        models,
+        Path(dirpath),
+        graph,
+        graph_name,
+        sidecar_threshold,
+        pool_options,
+        kwargs,
+    )
 
-def export_to_file(model, filename, **kwargs):
-    mls = _extract_mls(model, **kwargs)
-    with open(filename, "w") as f:
-        f.write(mls)
 
+def export_many(
+    models,
+    force=False,
+    graph=False,
+    graph_name=None,
+    sidecar_threshold=None,
+    workers=None,
+    executor="process",
+    chunksize=16,
+    **kwargs
+):
+    """Export ``models`` to the renku project, resolving it only once.
 
-def export(model, force=False, **kwargs):
-    mls = _extract_mls(model, **kwargs)
-    io.log_renku_mls(mls, str(model.__hash__()), force)
+    See ``export_many_to_dir`` for the options.
+    """
+    path = io.renku_mls_path(force)
+    if path is None:
+        return ExportSummary([], 0, 0.0)
+    pool_options = dict(workers=workers, executor=executor, chunksize=chunksize)
+    return _export_many_to_path(
+        models, path, graph, graph_name, sidecar_threshold, pool_options, kwargs
+    )
@@ -0,0 +1,156 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+import numpy as np
+
+ARRAY_FULL = "full"
+ARRAY_SUMMARY = "summary"
+ARRAY_SIDECAR = "sidecar"
+ARRAY_MODES = (ARRAY_FULL, ARRAY_SUMMARY, ARRAY_SIDECAR)
+SIDECAR_SUFFIX = ".npy"
+# dtype kinds converted, summarized and stored as a whole, others go
+# element by element through ``common.normalize_param``
+NUMERIC_KINDS = "biuf"
+
+
+def array_to_list(value):
+    """Convert the numeric array ``value`` to (nested) lists in one
+    vectorized pass.
+
+    Non finite floats become the strings ``"nan"``, ``"inf"`` and ``"-inf"``
+    like ``normalize_float`` does for scalars.
+    """
+    if value.dtype.kind == "f":
+        finite = np.isfinite(value)
+        if not finite.all():
+            out = value.astype(object)
+            nan = np.isnan(value)
+            out[nan] = "nan"
+            out[~finite & ~nan & (value > 0)] = "inf"
+            out[~finite & ~nan & (value < 0)] = "-inf"
+            return out.tolist()
+    return value.tolist()
+
+
+def array_digest(value):
+    """Content hash of ``value`` covering dtype, shape and data."""
+    value = np.ascontiguousarray(value)
+    digest = hashlib.sha256()
+    digest.update(value.dtype.str.encode())
+    digest.update(repr(value.shape).encode())
+    digest.update(value.tobytes())
+    return digest.hexdigest()
+
+
+def summarize_array(value):
+    summary = {
+        "shape": list(value.shape),
+        "dtype": value.dtype.str,
+        "sha256": array_digest(value),
+    }
+    if value.dtype.kind in NUMERIC_KINDS and value.size:
+        summary["min"] = array_to_list(np.nanmin(value).reshape(1))[0]
+        summary["max"] = array_to_list(np.nanmax(value).reshape(1))[0]
+    return summary
+
+
+def write_sidecar(value, directory):
+    """Store ``value`` as ``<directory>/<sha256>.npy`` unless already there."""
+    digest = array_digest(value)
+    directory = Path(directory)
+    path = directory / (digest + SIDECAR_SUFFIX)
+    if not path.exists():
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(directory), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, value, allow_pickle=False)
+            os.replace(tmp, str(path))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    return digest, path
+
+
+class ArrayPolicy:
+    """How array parameters with more than ``threshold`` elements are stored.
+
+    ``"full"`` inlines them as lists, ``"summary"`` keeps only shape, dtype,
+    min, max and a content hash, ``"sidecar"`` writes them to a ``.npy`` file
+    in ``sidecar_dir`` and references it by URI. Smaller arrays are always
+    inlined. With ``relative`` the URI is the bare file name, for sidecars
+    stored next to the document. Only numeric arrays are summarized or
+    stored in sidecars, the bytes of object arrays are pointers.
+    """
+
+    def __init__(
+        self, mode=ARRAY_FULL, threshold=1000, sidecar_dir=None, relative=False
+    ):
+        if mode not in ARRAY_MODES:
+            raise ValueError("unknown array mode {}".format(mode))
+        if mode == ARRAY_SIDECAR and sidecar_dir is None:
+            raise ValueError("sidecar mode requires a sidecar_dir")
+        self.mode = mode
+        self.threshold = threshold
+        self.sidecar_dir = sidecar_dir
+        self.relative = relative
+
+    def sidecar_uri(self, path):
+        if self.relative:
+            return Path(path).name
+        return Path(path).absolute().as_uri()
+
+    def reference(self, value):
+        """Return what replaces ``value`` in the document.
+
+        ``None`` means ``value`` is inlined as a list.
+        """
+        if (
+            self.mode == ARRAY_FULL
+            or value.dtype.kind not in NUMERIC_KINDS
+            or value.size <= self.threshold
+        ):
+            return None
+        summary = summarize_array(value)
+        if self.mode == ARRAY_SIDECAR:
+            _, path = write_sidecar(value, self.sidecar_dir)
+            summary["uri"] = self.sidecar_uri(path)
+        return summary
+
+
+def is_array_reference(value):
+    return isinstance(value, dict) and "sha256" in value and "uri" in value
+
+
+def array_path(reference, base_dir=None):
+    """Resolve the ``.npy`` file of a sidecar reference.
+
+    Relative URIs are resolved against ``base_dir``, the directory of the
+    document holding the reference.
+    """
+    uri = reference["uri"]
+    if uri.startswith("file:"):
+        return Path(url2pathname(urlparse(uri).path))
+    return Path(base_dir or ".") / uri
+
+
+def load_array(reference, base_dir=None, mmap_mode="r"):
+    """Load a sidecar array, memory-mapped read-only by default."""
+    return np.load(
+        str(array_path(reference, base_dir)), mmap_mode=mmap_mode, allow_pickle=False
+    )
+
+
+def resolve_arrays(value, base_dir=None, mmap_mode="r"):
+    """Replace all sidecar references in a loaded document by their arrays."""
+    if is_array_reference(value):
+        return load_array(value, base_dir, mmap_mode)
+    elif isinstance(value, dict):
+        return {k: resolve_arrays(v, base_dir, mmap_mode) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [resolve_arrays(v, base_dir, mmap_mode) for v in value]
+    return value
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from .arrays import ARRAY_SUMMARY, ArrayPolicy
+from .common import deep_get_params
+
+INDEX_NAME = ".export_index.jsonl"
+EVALUATION_MEASURE_KEY = "evaluation_measure"
+ARRAY_POLICY_KEY = "array_policy"
+
+
+def _library_version(model):
+    library = sys.modules.get(type(model).__module__.split(".")[0])
+    return getattr(library, "__version__", None)
+
+
+def _option(key, value):
+    if key == EVALUATION_MEASURE_KEY and value is not None:
+        func, measure = value
+        return [getattr(func, "__qualname__", str(func)), measure]
+    if key == ARRAY_POLICY_KEY and isinstance(value, ArrayPolicy):
+        return [value.mode, value.threshold, str(value.sidecar_dir), value.relative]
+    return value
+
+
+def export_digest(model, memo=None, **kwargs):
+    """Stable digest of what an export of ``model`` with ``kwargs`` depends on.
+
+    That is the model class, the library version, the normalized parameters,
+    the evaluation measure and every other option, unknown options by
+    their ``str``. Large arrays only contribute their content hash.
+    """
+    params = deep_get_params(
+        model.get_params(), model, memo=memo, array_policy=ArrayPolicy(ARRAY_SUMMARY)
+    )
+    content = [
+        "{}.{}".format(type(model).__module__, type(model).__name__),
+        _library_version(model),
+        params,
+        {k: _option(k, v) for k, v in kwargs.items()},
+    ]
+    text = json.dumps(content, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class ExportCache:
+    """Content-addressed cache of the documents exported to ``directory``.
+
+    Digests map to document paths through an in-memory LRU backed by an
+    append-only index file in ``directory``, so hits survive the process.
+    Entries whose document was removed count as misses. The documents are
+    named by their digest, so an entry never points to a document that was
+    overwritten by the export of other content.
+    """
+
+    def __init__(self, directory, maxsize=1024):
+        self.directory = Path(directory)
+        self.maxsize = maxsize
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._index = None
+        self._lock = threading.Lock()
+
+    @property
+    def index_path(self):
+        return self.directory / INDEX_NAME
+
+    @property
+    def hits(self):
+        return self.memory_hits + self.disk_hits
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+        }
+
+    def _load_index(self):
+        index = {}
+        if self.index_path.exists():
+            with self.index_path.open() as f:
+                for line in f:
+                    if line.endswith("\n"):
+                        entry = json.loads(line)
+                        index[entry["digest"]] = entry["name"]
+        return index
+
+    def _remember(self, digest, path):
+        self._entries[digest] = path
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get(self, digest):
+        """Return the path of the document exported for ``digest`` or ``None``."""
+        with self._lock:
+            path = self._entries.get(digest)
+            if path is not None and path.exists():
+                self._entries.move_to_end(digest)
+                self.memory_hits += 1
+                return path
+
+            if self._index is None:
+                self._index = self._load_index()
+            name = self._index.get(digest)
+            # older indexes name documents by the model, those may be stale
+            if (
+                name is not None
+                and name.startswith(digest)
+                and (self.directory / name).exists()
+            ):
+                path = self.directory / name
+                self._remember(digest, path)
+                self.disk_hits += 1
+                return path
+
+            self.misses += 1
+            return None
+
+    def put(self, digest, path):
+        path = Path(path)
+        with self._lock:
+            self._remember(digest, path)
+            if self._index is None:
+                self._index = self._load_index()
+            if self._index.get(digest) != path.name:
+                self._index[digest] = path.name
+                with self.index_path.open(mode="a") as f:
+                    f.write(json.dumps({"digest": digest, "name": path.name}) + "\n")
+
+    def clear(self):
+        """Forget all entries, in memory and on disk."""
+        with self._lock:
+            self._entries.clear()
+            self._index = {}
+            if self.index_path.exists():
+                self.index_path.unlink()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_export_cache(directory, maxsize=1024):
+    """The ``ExportCache`` of ``directory``, one per directory and process."""
+    directory = Path(directory)
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None:
+            cache = _caches[directory] = ExportCache(directory, maxsize)
+        return cache
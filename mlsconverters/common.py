@@ -1,9 +1,19 @@
+import hashlib
 import inspect
-from uuid import uuid1
+import itertools
+import json
+import os
+import secrets
+import threading
+from collections import OrderedDict
+from enum import Enum
+from functools import singledispatch
+from pathlib import PurePath
+from uuid import uuid4
 
 import numpy as np
 
-from .models import HyperParameter, HyperParameterSetting
+from .arrays import ARRAY_SUMMARY, NUMERIC_KINDS, ArrayPolicy, array_to_list
 
 
 def _jsonize_value(value):
@@ -19,6 +29,8 @@ def _jsonize_value(value):
 
 
 def mls_params(params, run_id):
+    from .models import HyperParameter, HyperParameterSetting
+
     mls_parameters = []
     mls_input_values = []
     for key, value in params.items():
@@ -34,6 +46,8 @@ def mls_params(params, run_id):
 
 
 def mls_param(key, value, run_id):
+    from .models import HyperParameter, HyperParameterSetting
+
     hp = HyperParameter(key, model_hash=run_id)
     return (
         hp,
@@ -51,6 +65,8 @@ def mls_add_param(mls, key, value):
 
 
 def mls_add_params(mls, params):
+    from .models import HyperParameter, HyperParameterSetting
+
     for key, value in params.items():
         hp = HyperParameter(key, model_hash=mls._id)
         mls.executes.parameters.append(hp)
@@ -165,5 +181,315 @@ def normalize_float(v):
         return v
 
 
-def generate_unique_id(prefix):
-    return "{}.{}".format(prefix, uuid1().fields[0])
+ID_COUNTER = "counter"
+ID_CONTENT = "content"
+ID_UUID = "uuid"
+
+
+class CounterIds:
+    """A random per-process prefix followed by a monotonic counter."""
+
+    deterministic = False
+
+    def __init__(self):
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def token(self, content=None):
+        if self._pid != os.getpid():
+            with self._lock:
+                # forked children must not continue the parent's sequence
+                if self._pid != os.getpid():
+                    self._prefix = secrets.token_hex(4)
+                    self._counter = itertools.count()
+                    self._pid = os.getpid()
+        return "{}-{}".format(self._prefix, next(self._counter))
+
+
+class ContentIds(CounterIds):
+    """A digest of the identified content, counter ids without content."""
+
+    deterministic = True
+
+    def token(self, content=None):
+        if content is None:
+            return super().token()
+        text = json.dumps(content, sort_keys=True, default=str)
+        return hashlib.sha256(text.encode()).hexdigest()[:32]
+
+
+class UuidIds:
+    """Random UUIDs."""
+
+    deterministic = False
+
+    def token(self, content=None):
+        return str(uuid4())
+
+
+ID_STRATEGIES = {ID_COUNTER: CounterIds, ID_CONTENT: ContentIds, ID_UUID: UuidIds}
+
+_id_strategy = CounterIds()
+
+
+def set_id_strategy(strategy):
+    """Select how ``generate_unique_id`` mints ids.
+
+    ``"counter"`` is the cheapest, ``"content"`` derives ids from what they
+    identify so that re-exporting an unchanged model gives identical output,
+    ``"uuid"`` uses random UUIDs.
+    """
+    global _id_strategy
+    if strategy not in ID_STRATEGIES:
+        raise ValueError("unknown id strategy {}".format(strategy))
+    _id_strategy = ID_STRATEGIES[strategy]()
+
+
+def get_id_strategy():
+    return _id_strategy
+
+
+def new_id(content=None):
+    return _id_strategy.token(content)
+
+
+def generate_unique_id(prefix, content=None):
+    return "{}.{}".format(prefix, _id_strategy.token(content))
+
+
+EVALUATION_MEASURES = {
+    "accuracy_score": "http://www.w3.org/ns/mls#accuracy",
+    "roc_auc_score": "http://www.w3.org/ns/mls#auROC",
+    "f1_score": "http://www.w3.org/ns/mls#F1",
+}
+
+
+def register_evaluation_measure(name, measure_id):
+    """Report metric functions named ``name`` as the ``measure_id`` measure."""
+    EVALUATION_MEASURES[name] = measure_id
+
+
+def model_evaluation(measure_id, value, model_hash=None, position=0):
+    """The ``position``-th output of the run, equal measures and values of
+    one run still get distinct ids under the ``"content"`` strategy.
+    """
+    from .models import EvaluationMeasure, ModelEvaluation
+
+    return ModelEvaluation(
+        _id=generate_unique_id(
+            "http://www.w3.org/ns/mls#ModelEvaluation",
+            content=[model_hash, measure_id, value, position],
+        ),
+        value=value,
+        specified_by=EvaluationMeasure(_id=measure_id),
+    )
+
+
+def evaluation_measure(func, value, model_hash=None, position=0):
+    if hasattr(func, "__qualname__"):
+        measure_id = EVALUATION_MEASURES.get(func.__qualname__)
+        if measure_id is None:
+            raise ValueError("unsupported evaluation measure")
+        return model_evaluation(measure_id, value, model_hash, position)
+
+
+def model_id(model):
+    """Id of the run of ``model``, a digest of its parameters if deterministic.
+
+    Otherwise it is ``model.__hash__()`` as before.
+    """
+    if not _id_strategy.deterministic:
+        return model.__hash__()
+    params = deep_get_params(
+        model.get_params(),
+        model,
+        array_policy=ArrayPolicy(ARRAY_SUMMARY),
+    )
+    model_class = "{}.{}".format(type(model).__module__, type(model).__name__)
+    return _id_strategy.token([model_class, params])
+
+
+class ParamsMemo:
+    """Bounded LRU memo of converted estimator parameter subtrees.
+
+    Estimators are looked up by identity and, when their shallow parameters
+    are hashable, by content, so a sub-estimator shared by several models is
+    converted once. Pass the same memo to several ``to_run`` calls to share
+    it across a batch; the models must not be mutated meanwhile.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # only the configuration travels to worker processes
+        return {"maxsize": self.maxsize}
+
+    def __setstate__(self, state):
+        self.__init__(state["maxsize"])
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _content_key(estimator, variant):
+        try:
+            params = estimator.get_params(deep=False)
+            key = (
+                type(estimator),
+                variant,
+                tuple((k, type(v), v) for k, v in sorted(params.items())),
+            )
+            hash(key)
+        except (AttributeError, TypeError):
+            return None
+        return key
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_convert(self, estimator, convert, variant=None):
+        """Return ``convert(estimator)``, reusing a memoized result."""
+        identity_key = ("id", id(estimator), variant)
+        entry = self._get(identity_key)
+        # the entry pins the estimator, so its id can't have been reused
+        if entry is not None and entry[0] is estimator:
+            self.hits += 1
+            return entry[1]
+        content_key = self._content_key(estimator, variant)
+        entry = self._get(content_key) if content_key is not None else None
+        if entry is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            entry = (estimator, convert(estimator))
+            if content_key is not None:
+                self._put(content_key, entry)
+        self._put(identity_key, (estimator, entry[1]))
+        return entry[1]
+
+
+class _UnsupportedValue(TypeError):
+    pass
+
+
+@singledispatch
+def normalize_param(value):
+    """Return ``value`` as JSON serializable data, dispatching on its type.
+
+    Raises ``TypeError`` for values that have no JSON representation.
+    """
+    if callable(value):
+        return str(value)  # TODO
+    raise _UnsupportedValue(
+        "Object of type {} is not JSON serializable".format(type(value).__name__)
+    )
+
+
+@normalize_param.register(str)
+@normalize_param.register(int)
+@normalize_param.register(type(None))
+def _normalize_primitive(value):
+    return value
+
+
+@normalize_param.register(float)
+def _normalize_float(value):
+    return normalize_float(value)
+
+
+@normalize_param.register(np.generic)
+def _normalize_numpy_scalar(value):
+    return normalize_param(value.item())
+
+
+@normalize_param.register(np.ndarray)
+def _normalize_ndarray(value):
+    if value.dtype.kind in NUMERIC_KINDS:
+        return array_to_list(value)
+    # complex, datetime, ... values are rejected by normalize_param
+    return [normalize_param(x) for x in value.tolist()]
+
+
+@normalize_param.register(list)
+@normalize_param.register(tuple)
+def _normalize_sequence(value):
+    return [normalize_param(x) for x in value]
+
+
+@normalize_param.register(dict)
+def _normalize_dict(value):
+    return {k: normalize_param(v) for k, v in value.items()}
+
+
+@normalize_param.register(Enum)
+def _normalize_enum(value):
+    return normalize_param(value.value)
+
+
+@normalize_param.register(PurePath)
+def _normalize_path(value):
+    return str(value)
+
+
+def deep_get_params(
+    params, model, memo=None, drop_nested_keys=False, array_policy=None
+):
+    """Convert (nested) estimator parameters to JSON serializable values.
+
+    Nested estimators become ``{"@value": {"type": ..., "params": ...}}``
+    and are converted once per ``memo``. With ``drop_nested_keys`` nested
+    estimators only report their own parameters, without the redundant
+    ``a__b`` keys of ``get_params(deep=True)``. Large arrays are handled
+    according to ``array_policy`` (an ``arrays.ArrayPolicy``). All other
+    values go through ``normalize_param``.
+    """
+    if memo is None:
+        memo = ParamsMemo()
+
+    def convert_estimator(v):
+        p = v.get_params(deep=not drop_nested_keys)
+        t = type(v).__module__ + "." + type(v).__name__
+        return {"@value": {"type": t, "params": convert(p)}}
+
+    def convert(params):
+        if isinstance(params, (list, tuple)):
+            return [convert(x) for x in params]
+        elif isinstance(params, dict):
+            return {k: convert(v) for k, v in params.items()}
+        elif hasattr(params, "get_params") and not isinstance(params, type):
+            try:
+                return memo.get_or_convert(
+                    params, convert_estimator, variant=(drop_nested_keys, array_policy)
+                )
+            except AttributeError:
+                pass
+        elif isinstance(params, np.ndarray) and array_policy is not None:
+            reference = array_policy.reference(params)
+            if reference is not None:
+                return reference
+        try:
+            return normalize_param(params)
+        except _UnsupportedValue as e:
+            raise NotImplementedError(
+                "can't convert sklearn model of type {} to mls: {}".format(
+                    type(model), e
+                )
+            )
+
+    return convert(params)
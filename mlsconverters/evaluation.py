@@ -0,0 +1,131 @@
+import numpy as np
+
+from .common import EVALUATION_MEASURES, normalize_float
+
+PREDICT = "predict"
+PREDICT_PROBA = "predict_proba"
+
+# metrics scoring class probabilities instead of predicted labels
+SCORE_METRICS = frozenset(
+    ("roc_auc_score", "log_loss", "average_precision_score", "brier_score_loss")
+)
+
+
+def _accuracy_score(y_true, y_pred):
+    return np.mean(y_true == y_pred)
+
+
+def _mean_squared_error(y_true, y_pred):
+    return np.mean(np.square(y_true - y_pred))
+
+
+def _mean_absolute_error(y_true, y_pred):
+    return np.mean(np.abs(y_true - y_pred))
+
+
+# plain NumPy versions of sklearn.metrics functions called without options
+_FAST_METRICS = {
+    "accuracy_score": _accuracy_score,
+    "mean_squared_error": _mean_squared_error,
+    "mean_absolute_error": _mean_absolute_error,
+}
+
+
+def _column_or_1d(y):
+    y = np.asarray(y)
+    if y.ndim == 2 and y.shape[1] == 1:
+        return y.ravel()
+    return y
+
+
+def _fast_metric(name):
+    fast = _FAST_METRICS[name]
+
+    def metric(y_true, y_pred):
+        y_true, y_pred = _column_or_1d(y_true), _column_or_1d(y_pred)
+        if y_true.ndim != 1 or y_true.shape != y_pred.shape:
+            # let sklearn handle (or reject) what would broadcast here
+            import sklearn.metrics
+
+            return getattr(sklearn.metrics, name)(y_true, y_pred)
+        return fast(y_true, y_pred)
+
+    return metric
+
+
+def metric_name(metric):
+    if isinstance(metric, str):
+        return metric
+    # functools.partial
+    metric = getattr(metric, "func", metric)
+    return getattr(metric, "__qualname__", type(metric).__name__)
+
+
+def _metric_function(metric):
+    name = metric_name(metric)
+    if isinstance(metric, str) or getattr(metric, "__module__", "").startswith(
+        "sklearn.metrics"
+    ):
+        if name in _FAST_METRICS:
+            return _fast_metric(name)
+    if isinstance(metric, str):
+        import sklearn.metrics
+
+        return getattr(sklearn.metrics, metric)
+    return metric
+
+
+def _rows(X, start, stop):
+    if hasattr(X, "iloc"):
+        return X.iloc[start:stop]
+    return X[start:stop]
+
+
+def _num_samples(X):
+    # scipy.sparse matrices have no len()
+    shape = getattr(X, "shape", None)
+    if shape:
+        return shape[0]
+    return len(X)
+
+
+def predict(model, X, method=PREDICT, chunksize=None):
+    """Run ``model.<method>`` on ``X``, ``chunksize`` rows at a time if set."""
+    func = getattr(model, method)
+    n_samples = _num_samples(X)
+    if chunksize is None or n_samples <= chunksize:
+        return np.asarray(func(X))
+    return np.concatenate(
+        [
+            np.asarray(func(_rows(X, start, start + chunksize)))
+            for start in range(0, n_samples, chunksize)
+        ]
+    )
+
+
+def evaluate(model, X, y, metrics, chunksize=None):
+    """Compute ``metrics`` of ``model`` on the test set ``(X, y)``.
+
+    Metrics are ``sklearn.metrics`` function names or ``f(y_true, y_pred)``
+    callables, those in ``SCORE_METRICS`` get the positive class probability
+    (all probabilities for more than two classes). Inference runs at most
+    once per method, on ``chunksize`` rows at a time if set. Returns
+    ``(measure_id, value)`` pairs, see ``common.EVALUATION_MEASURES``.
+    """
+    y = np.asarray(y)
+    outputs = {}
+    results = []
+    for metric in metrics:
+        name = metric_name(metric)
+        method = PREDICT_PROBA if name in SCORE_METRICS else PREDICT
+        if method not in outputs:
+            output = predict(model, X, method, chunksize)
+            if method == PREDICT_PROBA and output.ndim == 2 and output.shape[1] == 2:
+                output = output[:, 1]
+            outputs[method] = output
+        value = _metric_function(metric)(y, outputs[method])
+        measure_id = EVALUATION_MEASURES.get(
+            name, "http://www.w3.org/ns/mls#{}".format(name)
+        )
+        results.append((measure_id, normalize_float(float(value))))
+    return results
@@ -0,0 +1,190 @@
+import gzip
+import io
+import json
+from pathlib import Path
+
+FORMAT_JSONLD = "jsonld"
+FORMAT_GZIP = "jsonld.gz"
+FORMAT_ZSTD = "jsonld.zst"
+FORMAT_MSGPACK = "msgpack"
+FORMAT_CBOR = "cbor"
+FORMATS = (FORMAT_JSONLD, FORMAT_GZIP, FORMAT_ZSTD, FORMAT_MSGPACK, FORMAT_CBOR)
+
+# prefixes of the shared @context of compact documents
+CONTEXT = {
+    "mls": "http://www.w3.org/ns/mls#",
+    "dcterms": "http://purl.org/dc/terms/",
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "xsd": "http://www.w3.org/2001/XMLSchema#",
+}
+_PREFIXES = tuple((iri, prefix + ":") for prefix, iri in CONTEXT.items())
+# documents already write literal types as "xsd:...", those stay as they are
+_EXPANSIONS = {prefix + ":": iri for prefix, iri in CONTEXT.items() if prefix != "xsd"}
+
+
+def suffix(fmt):
+    if fmt not in FORMATS:
+        raise ValueError("unknown MLS format {}".format(fmt))
+    return "." + fmt
+
+
+def format_of(path):
+    """The format of ``path`` from its suffix, ``jsonld`` by default."""
+    name = Path(path).name
+    for fmt in FORMATS[1:]:
+        if name.endswith(suffix(fmt)):
+            return fmt
+    return FORMAT_JSONLD
+
+
+def _compact_iri(value):
+    for iri, prefix in _PREFIXES:
+        if value.startswith(iri):
+            return prefix + value[len(iri) :]
+    return value
+
+
+def _expand_iri(value):
+    head, sep, _ = value.partition(":")
+    iri = _EXPANSIONS.get(head + sep)
+    return iri + value[len(head) + 1 :] if iri is not None else value
+
+
+def _map_iris(node, convert, keys):
+    if isinstance(node, list):
+        return [_map_iris(item, convert, keys) for item in node]
+    if not isinstance(node, dict):
+        return node
+    mapped = {}
+    for key, value in node.items():
+        if key == "@id":
+            if isinstance(value, str):
+                value = convert(value)
+        elif key == "@type":
+            if isinstance(value, list):
+                value = [convert(t) for t in value]
+        elif isinstance(value, (dict, list)):
+            value = _map_iris(value, convert, keys)
+        # the few distinct properties are converted once per document
+        mapped_key = keys.get(key)
+        if mapped_key is None:
+            mapped_key = keys[key] = convert(key)
+        mapped[mapped_key] = value
+    return mapped
+
+
+def compact(document):
+    """Shorten the IRIs of ``document`` to ``mls:``, ``dcterms:`` and ``rdfs:``."""
+    compacted = {"@context": CONTEXT}
+    compacted.update(_map_iris(document, _compact_iri, {}))
+    return compacted
+
+
+def expand(document):
+    """Undo ``compact``, documents without ``@context`` are returned as is."""
+    if "@context" not in document:
+        return document
+    document = dict(document)
+    del document["@context"]
+    return _map_iris(document, _expand_iri, {})
+
+
+def _text_writer(fmt, f):
+    if fmt == FORMAT_GZIP:
+        return gzip.GzipFile(fileobj=f, mode="wb")
+    elif fmt == FORMAT_ZSTD:
+        import zstandard
+
+        return zstandard.ZstdCompressor().stream_writer(f, closefd=False)
+    return None
+
+
+def _text_reader(fmt, f):
+    if fmt == FORMAT_GZIP:
+        return gzip.GzipFile(fileobj=f, mode="rb")
+    elif fmt == FORMAT_ZSTD:
+        import zstandard
+
+        return zstandard.ZstdDecompressor().stream_reader(f, closefd=False)
+    return f
+
+
+def _binary(fmt):
+    if fmt == FORMAT_MSGPACK:
+        import msgpack
+
+        return msgpack
+    import cbor2
+
+    return cbor2
+
+
+def write(obj, f, fmt=FORMAT_JSONLD, compact_iris=False):
+    """Write ``obj`` to the binary file ``f`` in ``fmt``.
+
+    ``obj`` is a ``Run`` or an already serialized document (``str`` or
+    ``dict``). Runs in JSON-LD formats without ``compact_iris`` are
+    streamed, see ``serializer.dump_to``.
+    """
+    from . import serializer
+
+    if fmt not in FORMATS:
+        raise ValueError("unknown MLS format {}".format(fmt))
+    if fmt in (FORMAT_MSGPACK, FORMAT_CBOR) or compact_iris:
+        if isinstance(obj, str):
+            obj = json.loads(obj)
+        elif not isinstance(obj, dict):
+            obj = serializer.dump(obj, engine=serializer.ENGINE_COMPILED)
+        if compact_iris:
+            obj = compact(obj)
+        if fmt in (FORMAT_MSGPACK, FORMAT_CBOR):
+            f.write(_binary(fmt).dumps(obj))
+            return
+        obj = json.dumps(obj)
+
+    writer = _text_writer(fmt, f)
+    out = f if writer is None else writer
+    try:
+        if isinstance(obj, str):
+            out.write(obj.encode("utf-8"))
+        elif isinstance(obj, dict):
+            out.write(json.dumps(obj).encode("utf-8"))
+        else:
+            serializer.dump_to(obj, out, binary=True)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def dumps(obj, fmt=FORMAT_JSONLD, compact_iris=False):
+    """Like ``write``, returning ``bytes``."""
+    f = io.BytesIO()
+    write(obj, f, fmt, compact_iris)
+    return f.getvalue()
+
+
+def read(f, fmt=FORMAT_JSONLD):
+    """Read a document written by ``write`` from the binary file ``f``.
+
+    Compact documents are expanded, the result is the ``dict`` the plain
+    JSON-LD document loads to.
+    """
+    if fmt not in FORMATS:
+        raise ValueError("unknown MLS format {}".format(fmt))
+    if fmt in (FORMAT_MSGPACK, FORMAT_CBOR):
+        document = _binary(fmt).loads(f.read())
+    else:
+        document = json.load(_text_reader(fmt, f))
+    return expand(document)
+
+
+def loads(data, fmt=FORMAT_JSONLD):
+    return read(io.BytesIO(data), fmt)
+
+
+def load(path, fmt=None):
+    """Load the document at ``path``, in the format of its suffix by default."""
+    if fmt is None:
+        fmt = format_of(path)
+    with open(str(path), "rb") as f:
+        return read(f, fmt)
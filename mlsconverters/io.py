@@ -1,19 +1,60 @@
+import importlib
+import json
 import os
 from pathlib import Path
 
-import psutil
-from renku.core.util.contexts import renku_project_context
-from renku.domain_model.project_context import project_context
+from . import formats
+from .writer import BackgroundWriter, atomic_stream, atomic_write
 
 MLS_DIR = "ml"
 ENV_RENKU_HOME = "RENKU_HOME"
 COMMON_DIR = "latest"
+MLS_SUFFIX = ".jsonld"
 
+# (pid, inside renku) of the last ancestry check
+_inside_renku_state = None
+# (cwd, RENKU_HOME) -> resolved MLS directory
+_mls_path_cache = {}
+_existing_dirs = set()
+_mls_dir = None
+_background_writer = None
+_mls_format = formats.FORMAT_JSONLD
+_mls_compact = False
+_run_store = False
+
+# renku and psutil are slow to import and only needed to locate the project
+_LAZY_IMPORTS = {
+    "psutil": ("psutil", None),
+    "renku_project_context": ("renku.core.util.contexts", "renku_project_context"),
+    "project_context": ("renku.domain_model.project_context", "project_context"),
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    module_name, attr = _LAZY_IMPORTS[name]
+    value = importlib.import_module(module_name)
+    if attr is not None:
+        value = getattr(value, attr)
+    globals()[name] = value
+    return value
 
-def log_renku_mls(mls, hash, force=False):
-    inside_renku = False
 
-    parent = psutil.Process().parent()
+def _lazy(name):
+    """A lazily imported global, as patched by tests if it was."""
+    value = globals().get(name)
+    return __getattr__(name) if value is None else value
+
+
+def _inside_renku():
+    global _inside_renku_state
+    pid = os.getpid()
+    if _inside_renku_state is not None and _inside_renku_state[0] == pid:
+        return _inside_renku_state[1]
+
+    inside_renku = False
+    parent = _lazy("psutil").Process().parent()
 
     while parent is not None:
         if parent.name() == "renku" or "renku.ui.cli" in parent.cmdline():
@@ -21,18 +62,233 @@ def log_renku_mls(mls, hash, force=False):
             break
         parent = parent.parent()
 
-    if force or inside_renku:
-        with renku_project_context("."):
-            renku_project_root = project_context.metadata_path
+    _inside_renku_state = (pid, inside_renku)
+    return inside_renku
+
+
+def set_mls_dir(path):
+    """Log all MLS documents to ``path``, skipping renku detection.
+
+    ``None`` restores the default lookup.
+    """
+    global _mls_dir
+    _mls_dir = Path(path) if path is not None else None
+    _existing_dirs.clear()
+
+
+def set_mls_format(fmt=formats.FORMAT_JSONLD, compact=False):
+    """Log MLS documents in ``fmt``, one of ``formats.FORMATS``.
+
+    With ``compact`` the IRIs are shortened against a shared ``@context``,
+    see ``formats.compact``. ``formats.load`` reads any of them back.
+    """
+    global _mls_format, _mls_compact
+    formats.suffix(fmt)
+    _mls_format = fmt
+    _mls_compact = compact
+
+
+def _plain_format():
+    return _mls_format == formats.FORMAT_JSONLD and not _mls_compact
+
+
+def _document_path(path, hash):
+    return Path(path) / (hash + formats.suffix(_mls_format))
+
+
+def clear_cache():
+    global _inside_renku_state
+    _inside_renku_state = None
+    _mls_path_cache.clear()
+    _existing_dirs.clear()
+
+
+def renku_mls_path(force=False):
+    """Return the directory MLS documents are logged to.
+
+    Returns ``None`` when we are not running as part of ``renku run`` and
+    logging is not forced. The renku detection is done once per process and
+    the project lookup once per working directory and ``RENKU_HOME``.
+    """
+    if _mls_dir is not None:
+        return _mls_dir
+    if not (force or _inside_renku()):
+        return None
+
+    key = (os.getcwd(), os.environ.get(ENV_RENKU_HOME))
+    path = _mls_path_cache.get(key)
+    if path is None:
+        with _lazy("renku_project_context")("."):
+            renku_project_root = _lazy("project_context").metadata_path
+        path = Path(os.path.join(renku_project_root, MLS_DIR, COMMON_DIR))
+        _mls_path_cache[key] = path
+    return path
+
+
+def enable_background_writer(maxsize=1024):
+    """Hand MLS documents to a background thread instead of writing inline.
+
+    Returns the ``writer.BackgroundWriter``, e.g. to ``flush`` it or to
+    monitor its queue depth and write latency.
+    """
+    global _background_writer
+    if _background_writer is None or _background_writer.closed:
+        _background_writer = BackgroundWriter(maxsize, _atomic_write_in_dir)
+    return _background_writer
+
+
+def disable_background_writer():
+    """Drain and stop the background writer, later writes are inline."""
+    global _background_writer
+    writer, _background_writer = _background_writer, None
+    if writer is not None:
+        writer.close()
+
+
+def enable_run_store():
+    """Index every logged document in the ``store.RunStore`` of its
+    directory."""
+    global _run_store
+    _run_store = True
+
+
+def disable_run_store():
+    global _run_store
+    _run_store = False
+
+
+def _index(path, mls=None):
+    from .store import get_run_store
+
+    store = get_run_store(path.parent)
+    if mls is None:
+        store.index_file(path)
+    elif isinstance(mls, str):
+        store.index_document(path, json.loads(mls), _stat(path))
+    else:
+        store.index_document(path, formats.loads(mls, _mls_format), _stat(path))
+
+
+def _stat(path):
+    # the background writer may not have written it yet
+    try:
+        return path.stat()
+    except FileNotFoundError:
+        return None
+
+
+def write_mls(path, mls, hash):
+    """Write ``mls`` to ``<path>/<hash>.jsonld``, ``path`` has to exist.
+
+    The suffix and encoding follow ``set_mls_format``. With the background
+    writer enabled the write is only queued.
+    """
+    path = _document_path(path, hash)
+    if not _plain_format():
+        mls = formats.dumps(mls, _mls_format, _mls_compact)
+    if _background_writer is not None:
+        _background_writer.submit(path, mls)
     else:
+
+        def write():
+            with path.open(mode="w" if isinstance(mls, str) else "wb") as f:
+                f.write(mls)
+
+        _in_dir(path.parent, write)
+    if _run_store:
+        _index(path, mls)
+    return path
+
+
+def sidecar_array_policy(path, threshold=1000):
+    """Store arrays above ``threshold`` elements as ``.npy`` files in ``path``.
+
+    The files are content-addressed and referenced relative to the MLS
+    documents in ``path``, so an array shared by many runs is stored once.
+    """
+    from .arrays import ARRAY_SIDECAR, ArrayPolicy
+
+    return ArrayPolicy(ARRAY_SIDECAR, threshold, sidecar_dir=path, relative=True)
+
+
+def _ensure_dir(path):
+    if path not in _existing_dirs:
+        path.mkdir(parents=True, exist_ok=True)
+        _existing_dirs.add(path)
+
+
+def _in_dir(path, write):
+    # ``_ensure_dir`` remembers directories, recreate one removed since
+    try:
+        return write()
+    except FileNotFoundError:
+        _existing_dirs.discard(path)
+        _ensure_dir(path)
+        return write()
+
+
+def _atomic_write_in_dir(path, mls):
+    return _in_dir(path.parent, lambda: atomic_write(path, mls))
+
+
+def log_renku_mls(mls, hash, force=False):
+    path = renku_mls_path(force)
+    if path is None:
         # we are not running as part of renku run
         # hence NOP
         return
 
-    path = Path(os.path.join(renku_project_root, MLS_DIR, COMMON_DIR))
-    if not path.exists():
-        path.mkdir(parents=True)
+    _ensure_dir(path)
+    return write_mls(path, mls, hash)
+
+
+def log_renku_run(run, hash, force=False):
+    """Serialize ``run`` straight into ``<hash>.jsonld``, see ``log_renku_mls``.
+
+    The document is streamed to disk, never held as a whole in memory,
+    unless the background writer is enabled.
+    """
+    from . import serializer
+
+    path = renku_mls_path(force)
+    if path is None:
+        return None
+
+    _ensure_dir(path)
+    if _background_writer is not None:
+        return write_mls(path, serializer.dumps(run), hash)
+    if _plain_format():
+        path = _in_dir(
+            path,
+            lambda: atomic_stream(
+                _document_path(path, hash), lambda f: serializer.dump_to(run, f)
+            ),
+        )
+    else:
+        path = _in_dir(
+            path,
+            lambda: atomic_stream(
+                _document_path(path, hash),
+                lambda f: formats.write(run, f, _mls_format, _mls_compact),
+                binary=True,
+            ),
+        )
+    if _run_store:
+        # the run may stream its outputs, read them back from the document
+        _index(path)
+    return path
+
+
+def open_renku_run_log(hash, force=False):
+    """Open the append-only ``<hash>.events.jsonl`` run log.
+
+    Returns ``None`` when not logging, see ``renku_mls_path``.
+    """
+    from .runlog import EVENTS_SUFFIX, RunLog
+
+    path = renku_mls_path(force)
+    if path is None:
+        return None
 
-    path = path / (hash + ".jsonld")
-    with path.open(mode="w") as f:
-        f.write(mls)
+    _ensure_dir(path)
+    return _in_dir(path, lambda: RunLog(path / (hash + EVENTS_SUFFIX)))
@@ -1,20 +1,56 @@
 from distutils.version import LooseVersion
-from uuid import uuid1
 
 import gorilla
 
-from .common import fn_args_as_params, mls_add_param
-from .io import log_renku_mls
+from . import serializer
+from .common import fn_args_as_params, mls_add_param, new_id
+from .io import log_renku_mls, open_renku_run_log
+from .metrics import FlushPolicy, MetricLog
 from .models import (Algorithm, EvaluationMeasure, Implementation,
-                     ModelEvaluation, Run, RunSchema)
+                     ModelEvaluation, Run)
 
 
-def autolog():
+def autolog(flush_every_epochs=None, flush_every_seconds=None):
+    """Log ``keras.Model.fit`` runs as MLS documents.
+
+    Epoch metrics end up as ``ModelEvaluation`` outputs with their step.
+    With ``flush_every_epochs`` or ``flush_every_seconds`` set the run is
+    also streamed to the ``<hash>.events.jsonl`` run log while training.
+    """
     import keras
 
+    stream_metrics = flush_every_epochs is not None or flush_every_seconds is not None
+
     class __MLSKerasCallback(keras.callbacks.Callback):
-        def __init__(self):
-            self.mls = Run(uuid1())
+        def __init__(self, hash):
+            self.hash = hash
+            self.mls = Run(new_id(), input_values=[], output_values=[])
+            self.metrics = MetricLog()
+            self.flush_policy = FlushPolicy(flush_every_epochs, flush_every_seconds)
+            self.run_log = None
+
+        def _open_run_log(self):
+            self.run_log = open_renku_run_log(self.hash, force=True)
+            if self.run_log is None:
+                return
+            implementation = self.mls.executes
+            self.run_log.run(self.mls._id, algorithm=implementation.implements._id)
+            self.run_log.implementation(
+                implementation._id,
+                algorithm=implementation.implements._id,
+                version=implementation.version,
+            )
+            self.run_log.params(
+                {iv.specified_by.label: iv.value for iv in self.mls.input_values}
+            )
+
+        def _flush_metrics(self):
+            events = self.metrics.pending_events()
+            if events:
+                if self.run_log is None:
+                    self._open_run_log()
+                if self.run_log is not None:
+                    self.run_log.append(events)
 
         def on_train_begin(self, logs=None):
             mls_add_param(self.mls, "num_layers", len(self.model.layers))
@@ -39,10 +75,15 @@ def autolog():
         def on_epoch_end(self, epoch, logs=None):
             if not logs:
                 return
-            # try_mlflow_log(mlflow.log_metrics, logs, step=epoch)
+            self.metrics.log(logs, step=epoch)
+            if stream_metrics and self.flush_policy.step():
+                self._flush_metrics()
 
         def on_train_end(self, logs=None):
-            return
+            if stream_metrics:
+                self._flush_metrics()
+            if self.run_log is not None:
+                self.run_log.close()
 
         # As of Keras 2.4.0, Keras Callback implementations must define the following
         # methods indicating whether or not the callback overrides functions for
@@ -93,7 +134,7 @@ def autolog():
     def _run_and_log_function(
         self, original, args, kwargs, unlogged_params, callback_arg_index
     ):
-        mls_callback = __MLSKerasCallback()
+        mls_callback = __MLSKerasCallback(str(self.__hash__()))
         model_class = "keras.Model"
 
         algo = Algorithm(_id="NeuralNetwork")
@@ -126,9 +167,15 @@ def autolog():
 
         history = original(self, *args, **kwargs)
 
+        mls_callback.mls.output_values += mls_callback.metrics.evaluations(
+            mls_callback.mls._id
+        )
         log_renku_mls(
-            RunSchema().dumps(mls_callback.mls), str(self.__hash__()), force=True
+            serializer.dumps(mls_callback.mls), str(self.__hash__()), force=True
         )
+        if mls_callback.run_log is not None:
+            # the document supersedes the streamed run log
+            mls_callback.run_log.discard()
 
         return history
 
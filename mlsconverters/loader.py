@@ -0,0 +1,244 @@
+from . import formats
+
+MLS = "http://www.w3.org/ns/mls#"
+DC_TERMS = "http://purl.org/dc/terms/"
+RDFS = "http://www.w3.org/2000/01/rdf-schema#"
+
+ID = "@id"
+VALUE = "@value"
+EXECUTES = MLS + "executes"
+IMPLEMENTS = MLS + "implements"
+HAS_INPUT = MLS + "hasInput"
+HAS_OUTPUT = MLS + "hasOutput"
+HAS_HYPER_PARAMETER = MLS + "hasHyperParameter"
+HAS_VALUE = MLS + "hasValue"
+SPECIFIED_BY = MLS + "specifiedBy"
+STEP = MLS + "step"
+TITLE = DC_TERMS + "title"
+HAS_VERSION = DC_TERMS + "hasVersion"
+LABEL = RDFS + "label"
+
+_HYPER_PARAMETER_PREFIX = MLS + "HyperParameter."
+
+_UNSET = object()
+
+
+def _value(node):
+    value = node.get(HAS_VALUE)
+    if type(value) is dict:
+        return value.get(VALUE)
+    return value
+
+
+def measure_name(measure_id):
+    """The metric name of an evaluation measure IRI, e.g. ``accuracy``."""
+    if measure_id.startswith(MLS):
+        return measure_id[len(MLS) :]
+    return measure_id.rpartition("/")[2]
+
+
+def _selected(names):
+    return None if names is None else frozenset(names)
+
+
+def _model_hash(parameter_id, label):
+    # HyperParameter.<label>.<model hash>
+    return parameter_id[len(_HYPER_PARAMETER_PREFIX) + len(label) + 1 :]
+
+
+class RunDocument:
+    """Read-only view of a decoded ``RunSchema`` document.
+
+    Nothing is converted up front. ``hyperparameters`` and ``metrics`` read
+    plain values straight from the document, while ``executes``,
+    ``input_values`` and ``output_values`` build the ``models`` objects on
+    first access only. Array sidecar references are returned as is, see
+    ``arrays.resolve_arrays``.
+    """
+
+    __slots__ = ("document", "_labels", "_executes", "_input_values", "_output_values")
+
+    def __init__(self, document):
+        self.document = document
+        self._labels = None
+        self._executes = _UNSET
+        self._input_values = None
+        self._output_values = None
+
+    @property
+    def _id(self):
+        return self.document.get(ID)
+
+    @property
+    def name(self):
+        return self.document.get(TITLE)
+
+    @property
+    def version(self):
+        return self.document.get(HAS_VERSION)
+
+    @property
+    def algorithm(self):
+        """The label of the realized algorithm."""
+        algorithm = self.document.get(IMPLEMENTS)
+        return algorithm.get(LABEL, algorithm.get(ID)) if algorithm else None
+
+    def _label(self, parameter_id):
+        if self._labels is None:
+            implementation = self.document.get(EXECUTES) or {}
+            self._labels = {
+                p[ID]: p.get(LABEL) for p in implementation.get(HAS_HYPER_PARAMETER, ())
+            }
+        label = self._labels.get(parameter_id)
+        if label is None:
+            # not declared by the implementation, assume a dot free hash
+            label = parameter_id[len(_HYPER_PARAMETER_PREFIX) :].rpartition(".")[0]
+        return label
+
+    def hyperparameters(self, names=None):
+        """``{label: value}`` of the hyperparameter settings, only ``names``
+        if given."""
+        names = _selected(names)
+        values = {}
+        if names is not None and not names:
+            return values
+        for setting in self.document.get(HAS_INPUT, ()):
+            label = self._label(setting[SPECIFIED_BY][ID])
+            if names is None or label in names:
+                values[label] = _value(setting)
+        return values
+
+    def metric_series(self, names=None):
+        """``{metric name: [(step, value), ...]}`` of the model evaluations in
+        document order, only ``names`` if given. ``step`` is ``None`` for
+        evaluations that are not part of a series."""
+        names = _selected(names)
+        series = {}
+        if names is not None and not names:
+            return series
+        for evaluation in self.document.get(HAS_OUTPUT, ()):
+            name = measure_name(evaluation[SPECIFIED_BY][ID])
+            if names is None or name in names:
+                series.setdefault(name, []).append(
+                    (evaluation.get(STEP), _value(evaluation))
+                )
+        return series
+
+    def metrics(self, names=None):
+        """``{metric name: value}``, the last value of each series."""
+        return {
+            name: points[-1][1] for name, points in self.metric_series(names).items()
+        }
+
+    @property
+    def realizes(self):
+        from .models import Algorithm
+
+        algorithm = self.algorithm
+        return Algorithm(algorithm) if algorithm is not None else None
+
+    @property
+    def executes(self):
+        if self._executes is _UNSET:
+            self._executes = self._implementation()
+        return self._executes
+
+    def _implementation(self):
+        from .models import Algorithm, HyperParameter, Implementation
+
+        implementation = self.document.get(EXECUTES)
+        if implementation is None:
+            return None
+        algorithm = implementation.get(IMPLEMENTS)
+        return Implementation(
+            implementation[ID],
+            [
+                HyperParameter(p[LABEL], _model_hash(p[ID], p[LABEL]))
+                for p in implementation.get(HAS_HYPER_PARAMETER, ())
+            ],
+            implements=(
+                Algorithm(algorithm.get(LABEL, algorithm.get(ID)))
+                if algorithm
+                else None
+            ),
+            version=implementation.get(HAS_VERSION),
+            name=implementation.get(TITLE),
+        )
+
+    @property
+    def input_values(self):
+        if self._input_values is None:
+            from .models import HyperParameter, HyperParameterSetting
+
+            input_values = []
+            for setting in self.document.get(HAS_INPUT, ()):
+                parameter_id = setting[SPECIFIED_BY][ID]
+                label = self._label(parameter_id)
+                model_hash = _model_hash(parameter_id, label)
+                input_values.append(
+                    HyperParameterSetting(
+                        _value(setting), HyperParameter(label, model_hash), model_hash
+                    )
+                )
+            self._input_values = input_values
+        return self._input_values
+
+    @property
+    def output_values(self):
+        if self._output_values is None:
+            from .models import EvaluationMeasure, ModelEvaluation
+
+            measures = {}
+            output_values = []
+            for evaluation in self.document.get(HAS_OUTPUT, ()):
+                measure_id = evaluation[SPECIFIED_BY][ID]
+                measure = measures.get(measure_id)
+                if measure is None:
+                    measure = measures[measure_id] = EvaluationMeasure(measure_id)
+                output_values.append(
+                    ModelEvaluation(
+                        evaluation[ID],
+                        _value(evaluation),
+                        measure,
+                        step=evaluation.get(STEP),
+                    )
+                )
+            self._output_values = output_values
+        return self._output_values
+
+    def to_run(self):
+        """Materialize the whole document as a ``models.Run``."""
+        from .models import Run
+
+        return Run(
+            self._id,
+            executes=self.executes,
+            input_values=self.input_values,
+            output_values=self.output_values,
+            realizes=self.realizes,
+            version=self.version,
+            name=self.name,
+        )
+
+
+def load(path, fmt=None):
+    """Load the document at ``path`` as a ``RunDocument``, see
+    ``formats.load``."""
+    return RunDocument(formats.load(path, fmt))
+
+
+def loads(data, fmt=formats.FORMAT_JSONLD):
+    """Like ``load``, from ``str`` or ``bytes``."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return RunDocument(formats.loads(data, fmt))
+
+
+def extract(path, hyperparameters=None, metrics=None, fmt=None):
+    """Fast path reading only selected values of the document at ``path``.
+
+    Returns ``(hyperparameters, metrics)`` dicts as ``RunDocument``'s, no
+    model objects are built. ``None`` selects all, an empty list none.
+    """
+    document = load(path, fmt)
+    return document.hyperparameters(hyperparameters), document.metrics(metrics)
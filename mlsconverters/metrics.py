@@ -0,0 +1,192 @@
+import time
+
+import numpy as np
+
+from .common import normalize_float
+
+AGGREGATE_SERIES = "series"
+AGGREGATE_LAST = "last"
+AGGREGATE_MIN = "min"
+AGGREGATE_MAX = "max"
+AGGREGATIONS = (AGGREGATE_SERIES, AGGREGATE_LAST, AGGREGATE_MIN, AGGREGATE_MAX)
+
+
+class MetricSeries:
+    """Columnar storage of one metric: values, steps and wall times.
+
+    The columns are preallocated NumPy arrays that grow geometrically, so
+    appending a point does not allocate a Python object per value.
+    """
+
+    def __init__(self, name, capacity=64):
+        self.name = name
+        self.size = 0
+        self._values = np.empty(capacity, dtype=np.float64)
+        self._steps = np.empty(capacity, dtype=np.int64)
+        self._times = np.empty(capacity, dtype=np.float64)
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self):
+        capacity = max(2 * len(self._values), 1)
+        for column in ("_values", "_steps", "_times"):
+            old = getattr(self, column)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[: self.size] = old[: self.size]
+            setattr(self, column, new)
+
+    def append(self, value, step, wall_time):
+        if self.size == len(self._values):
+            self._grow()
+        self._values[self.size] = value
+        self._steps[self.size] = step
+        self._times[self.size] = wall_time
+        self.size += 1
+
+    @property
+    def values(self):
+        return self._values[: self.size]
+
+    @property
+    def steps(self):
+        return self._steps[: self.size]
+
+    @property
+    def times(self):
+        return self._times[: self.size]
+
+    @classmethod
+    def concatenate(cls, name, series):
+        """One series with the points of ``series`` in wall time order."""
+        merged = cls(name, capacity=0)
+        merged._values = np.concatenate([s.values for s in series])
+        merged._steps = np.concatenate([s.steps for s in series])
+        merged._times = np.concatenate([s.times for s in series])
+        merged.size = len(merged._values)
+        order = np.argsort(merged._times, kind="stable")
+        for column in ("_values", "_steps", "_times"):
+            setattr(merged, column, getattr(merged, column)[order])
+        return merged
+
+    def select(self, aggregation=AGGREGATE_SERIES, max_points=None):
+        """Indices of the points kept by ``aggregation``.
+
+        ``"series"`` keeps every point, or ``max_points`` evenly spaced ones
+        including the first and the last. ``"min"`` and ``"max"`` ignore NaNs.
+        """
+        if aggregation not in AGGREGATIONS:
+            raise ValueError("unknown aggregation {}".format(aggregation))
+        if not self.size:
+            return np.arange(0)
+        if aggregation == AGGREGATE_SERIES:
+            if max_points is None or self.size <= max_points:
+                return np.arange(self.size)
+            return np.unique(
+                np.linspace(0, self.size - 1, max_points).round().astype(np.int64)
+            )
+        values = self.values
+        if aggregation == AGGREGATE_LAST or np.isnan(values).all():
+            return np.array([self.size - 1])
+        elif aggregation == AGGREGATE_MIN:
+            return np.array([np.nanargmin(values)])
+        return np.array([np.nanargmax(values)])
+
+
+class MetricLog:
+    """Metric series keyed by name, with a cursor of what was flushed."""
+
+    def __init__(self):
+        self.series = {}
+        self._flushed = {}
+
+    def __len__(self):
+        return sum(len(s) for s in self.series.values())
+
+    def log(self, metrics, step, wall_time=None):
+        if wall_time is None:
+            wall_time = time.time()
+        for name, value in metrics.items():
+            series = self.series.get(name)
+            if series is None:
+                series = self.series[name] = MetricSeries(name)
+            series.append(value, step, wall_time)
+
+    @classmethod
+    def merge(cls, logs):
+        """Merge ``logs`` into one, see ``MetricSeries.concatenate``."""
+        by_name = {}
+        for log in logs:
+            for name, series in log.series.items():
+                by_name.setdefault(name, []).append(series)
+        merged = cls()
+        for name, series in by_name.items():
+            merged.series[name] = MetricSeries.concatenate(name, series)
+        return merged
+
+    def pending_events(self):
+        """Run log metric events of the points logged since the last call."""
+        from .runlog import metric_event
+
+        events = []
+        for name, series in self.series.items():
+            start = self._flushed.get(name, 0)
+            for value, step, wall_time in zip(
+                series.values[start:].tolist(),
+                series.steps[start:].tolist(),
+                series.times[start:].tolist(),
+            ):
+                events.append(metric_event(name, value, step, wall_time))
+            self._flushed[name] = len(series)
+        return events
+
+    def evaluations(self, run_id, aggregation=AGGREGATE_SERIES, max_points=None):
+        """``ModelEvaluation`` nodes with their step, see ``MetricSeries.select``.
+
+        By default there is one per logged point. Node ids carry the position
+        of the point in its series, steps may repeat in merged logs.
+        """
+        return list(self.iter_evaluations(run_id, aggregation, max_points))
+
+    def iter_evaluations(self, run_id, aggregation=AGGREGATE_SERIES, max_points=None):
+        """Like ``evaluations``, creating the nodes as they are consumed."""
+        from .models import EvaluationMeasure, ModelEvaluation
+
+        for name, series in self.series.items():
+            measure = EvaluationMeasure(_id="http://www.w3.org/ns/mls#{}".format(name))
+            index = series.select(aggregation, max_points)
+            for position, value, step in zip(
+                index.tolist(),
+                series.values[index].tolist(),
+                series.steps[index].tolist(),
+            ):
+                yield ModelEvaluation(
+                    _id="http://www.w3.org/ns/mls#ModelEvaluation.{}.{}.{}".format(
+                        name, position, run_id
+                    ),
+                    value=normalize_float(value),
+                    specified_by=measure,
+                    step=step,
+                )
+
+
+class FlushPolicy:
+    """Flush every ``every_steps`` logged steps and/or ``every_seconds``."""
+
+    def __init__(self, every_steps=None, every_seconds=None):
+        self.every_steps = every_steps
+        self.every_seconds = every_seconds
+        self._steps = 0
+        self._last = time.monotonic()
+
+    def step(self):
+        """Record a step, return whether a flush is due."""
+        self._steps += 1
+        due = (self.every_steps is not None and self._steps >= self.every_steps) or (
+            self.every_seconds is not None
+            and time.monotonic() - self._last >= self.every_seconds
+        )
+        if due:
+            self._steps = 0
+            self._last = time.monotonic()
+        return due
@@ -16,7 +16,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
+import sys
+import threading
 
 import calamus.fields as fields
 import marshmallow.fields as msmlfields
@@ -49,13 +50,21 @@ class ParameterValue(_JsonLDField, msmlfields.Field):
         return value
 
     def _deserialize(self, value, attr, data, **kwargs):
-        v = json.loads(value)
-        return v["@value"]
+        # the value is already decoded, typed values are {"@type", "@value"}
+        if isinstance(value, dict) and "@value" in value:
+            return value["@value"]
+        return value
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
 
 
 class EvaluationMeasure:
+    __slots__ = ("_id",)
+
     def __init__(self, _id):
-        self._id = _id
+        self._id = _intern(_id)
 
 
 class EvaluationMeasureSchema(JsonLDSchema):
@@ -67,16 +76,23 @@ class EvaluationMeasureSchema(JsonLDSchema):
 
 
 class ModelEvaluation:
-    def __init__(self, _id, value, specified_by):
+    __slots__ = ("_id", "value", "specified_by", "step")
+
+    def __init__(self, _id, value, specified_by, step=None):
         self._id = _id
         self.value = value
         self.specified_by = specified_by
+        if step is not None:
+            # only evaluations of a training step carry (and dump) it,
+            # an unset slot is skipped like a missing attribute
+            self.step = step
 
 
 class ModelEvaluationSchema(JsonLDSchema):
     _id = fields.Id()
     value = ParameterValue(ML_SCHEMA.hasValue)
     specified_by = fields.Nested(ML_SCHEMA.specifiedBy, EvaluationMeasureSchema)
+    step = fields.Integer(ML_SCHEMA.step)
 
     class Meta:
         rdf_type = ML_SCHEMA.ModelEvaluation
@@ -84,11 +100,21 @@ class ModelEvaluationSchema(JsonLDSchema):
 
 
 class HyperParameter:
+    __slots__ = ("label", "model_hash", "_iri")
+
     def __init__(self, _id, model_hash):
-        self._id = "http://www.w3.org/ns/mls#HyperParameter.{}.{}".format(
-            _id, model_hash
-        )
-        self.label = _id
+        self.label = _intern(_id)
+        self.model_hash = model_hash
+        self._iri = None
+
+    @property
+    def _id(self):
+        # built on first access, e.g. when dumped, and kept
+        if self._iri is None:
+            self._iri = "http://www.w3.org/ns/mls#HyperParameter.{}.{}".format(
+                self.label, self.model_hash
+            )
+        return self._iri
 
 
 class HyperParameterSchema(JsonLDSchema):
@@ -101,9 +127,14 @@ class HyperParameterSchema(JsonLDSchema):
 
 
 class Algorithm:
+    __slots__ = ("_id",)
+
     def __init__(self, _id):
-        self._id = _id
-        self.label = _id
+        self._id = _intern(_id)
+
+    @property
+    def label(self):
+        return self._id
 
 
 class AlgorithmSchema(JsonLDSchema):
@@ -116,10 +147,21 @@ class AlgorithmSchema(JsonLDSchema):
 
 
 class HyperParameterSetting:
+    __slots__ = ("value", "specified_by", "model_hash", "_iri")
+
     def __init__(self, value, specified_by, model_hash):
-        self._id = f"http://www.w3.org/ns/mls#HyperParameterSetting.{specified_by.label}.{model_hash}"
         self.value = value
         self.specified_by = specified_by
+        self.model_hash = model_hash
+        self._iri = None
+
+    @property
+    def _id(self):
+        if self._iri is None:
+            self._iri = "http://www.w3.org/ns/mls#HyperParameterSetting.{}.{}".format(
+                self.specified_by.label, self.model_hash
+            )
+        return self._iri
 
 
 class HyperParameterSettingSchema(JsonLDSchema):
@@ -138,8 +180,10 @@ class HyperParameterSettingSchema(JsonLDSchema):
 class Implementation:
     """Repesent an ML Schema defined Model."""
 
+    __slots__ = ("_id", "name", "parameters", "implements", "version")
+
     def __init__(self, _id, parameters, implements=None, version=None, name=None):
-        self._id = _id
+        self._id = _intern(_id)
         self.name = name
         self.parameters = parameters
         self.implements = implements
@@ -161,20 +205,30 @@ class ImplementationSchema(JsonLDSchema):
 
 
 class Run:
+    __slots__ = (
+        "_id",
+        "executes",
+        "input_values",
+        "output_values",
+        "realizes",
+        "version",
+        "name",
+    )
+
     def __init__(
         self,
         _id,
         executes=None,
-        input_values=[],
-        output_values=[],
+        input_values=None,
+        output_values=None,
         realizes=None,
         version=None,
         name=None,
     ):
         self._id = _id
         self.executes = executes
-        self.input_values = input_values
-        self.output_values = output_values
+        self.input_values = [] if input_values is None else input_values
+        self.output_values = [] if output_values is None else output_values
         self.realizes = realizes
         self.version = version
         self.name = name
@@ -194,3 +248,38 @@ class RunSchema(JsonLDSchema):
     class Meta:
         rdf_type = ML_SCHEMA.Run
         model = Run
+
+
+_schema_registry = {}
+_schema_registry_lock = threading.Lock()
+
+
+def _prepare_nested_schemas(schema):
+    """Build the lazily created nested schemas up front."""
+    for field in schema.dump_fields.values():
+        if isinstance(field, fields.Nested):
+            for nested in field.schema["to"].values():
+                _prepare_nested_schemas(nested)
+
+
+def get_schema(schema_class, flattened=False, only=None):
+    """Return a shared, pre-built instance of ``schema_class``.
+
+    Instances are keyed by schema class and options, so repeated exports do
+    not rebuild the nested calamus schemas.
+    """
+    key = (schema_class, flattened, tuple(only) if only is not None else None)
+    schema = _schema_registry.get(key)
+    if schema is None:
+        with _schema_registry_lock:
+            schema = _schema_registry.get(key)
+            if schema is None:
+                schema = schema_class(flattened=flattened, only=only)
+                _prepare_nested_schemas(schema)
+                _schema_registry[key] = schema
+    return schema
+
+
+def clear_schema_registry():
+    with _schema_registry_lock:
+        _schema_registry.clear()
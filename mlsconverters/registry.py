@@ -0,0 +1,97 @@
+import importlib
+import sys
+import threading
+
+ENTRY_POINT_GROUP = "mlsconverters.converters"
+
+
+def _class_name(cls):
+    return "{}.{}".format(cls.__module__, cls.__qualname__)
+
+
+def _entry_points():
+    from importlib import metadata
+
+    if sys.version_info >= (3, 10):
+        return metadata.entry_points(group=ENTRY_POINT_GROUP)
+    return metadata.entry_points().get(ENTRY_POINT_GROUP, [])
+
+
+def _resolve(converter):
+    if isinstance(converter, str):
+        return importlib.import_module(converter)
+    if not hasattr(converter, "to_mls") and hasattr(converter, "load"):
+        # an entry point, imported only once a model needs it
+        return converter.load()
+    return converter
+
+
+class ConverterRegistry:
+    """Converters (anything with ``to_mls`` and ``to_run``) keyed by model type.
+
+    A key is a class or its ``"module.QualName"``, so converters of
+    libraries that are not imported yet can be registered. A model is
+    handled by the converter of the first class of its MRO with one, the
+    result is cached per class. A converter given as a module name is only
+    imported when first used. Plugins register converters under the
+    ``mlsconverters.converters`` entry point group, the entry point name
+    being the key. They are discovered on the first lookup and imported
+    when first used.
+    """
+
+    def __init__(self):
+        self._converters = {}
+        self._cache = {}
+        self._entry_points_loaded = False
+        self._lock = threading.Lock()
+
+    def register(self, key, converter):
+        if isinstance(key, type):
+            key = _class_name(key)
+        with self._lock:
+            self._converters[key] = converter
+            self._cache.clear()
+
+    def _load_entry_points(self):
+        for entry_point in _entry_points():
+            self._converters.setdefault(entry_point.name, entry_point)
+        self._entry_points_loaded = True
+
+    def _lookup(self, cls):
+        for klass in cls.__mro__:
+            key = _class_name(klass)
+            converter = self._converters.get(key)
+            if converter is not None:
+                converter = self._converters[key] = _resolve(converter)
+                return converter
+        return None
+
+    def get(self, cls):
+        converter = self._cache.get(cls)
+        if converter is not None:
+            return converter
+
+        with self._lock:
+            # before the first lookup, a plugin for a subclass of a built-in
+            # key, e.g. of BaseEstimator, has to win over the built-in one
+            if not self._entry_points_loaded:
+                self._load_entry_points()
+            converter = self._lookup(cls)
+            if converter is None:
+                raise ValueError("Unsupported library")
+            self._cache[cls] = converter
+        return converter
+
+
+converters = ConverterRegistry()
+converters.register("sklearn.base.BaseEstimator", "mlsconverters.sklearn")
+converters.register("xgboost.sklearn.XGBModel", "mlsconverters.xgboost")
+
+
+def register_converter(key, converter):
+    """Register ``converter`` for models of class ``key`` and subclasses."""
+    converters.register(key, converter)
+
+
+def get_converter(model):
+    return converters.get(type(model))
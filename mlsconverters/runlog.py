@@ -0,0 +1,222 @@
+import json
+from pathlib import Path
+
+from . import serializer
+from .common import normalize_float, normalize_param
+from .models import (
+    Algorithm,
+    EvaluationMeasure,
+    HyperParameter,
+    HyperParameterSetting,
+    Implementation,
+    ModelEvaluation,
+    Run,
+)
+from .writer import atomic_write
+
+EVENTS_SUFFIX = ".events.jsonl"
+
+EVENT_RUN = "run"
+EVENT_IMPLEMENTATION = "implementation"
+EVENT_PARAM = "param"
+EVENT_METRIC = "metric"
+
+
+class RunLog:
+    """Append-only JSON Lines log of the events of one run.
+
+    Every update costs one appended line, whatever the size of the run.
+    ``compact`` turns the log into the ``RunSchema`` JSON-LD document.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        _truncate_torn_line(self.path)
+        self._file = self.path.open(mode="a")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def append(self, events):
+        self._file.writelines(json.dumps(event) + "\n" for event in events)
+        self._file.flush()
+
+    def run(self, run_id, algorithm=None, name=None):
+        self.append(
+            [{"event": EVENT_RUN, "id": run_id, "algorithm": algorithm, "name": name}]
+        )
+
+    def implementation(self, _id, algorithm=None, version=None, name=None):
+        self.append(
+            [
+                {
+                    "event": EVENT_IMPLEMENTATION,
+                    "id": _id,
+                    "algorithm": algorithm,
+                    "version": version,
+                    "name": name,
+                }
+            ]
+        )
+
+    def params(self, params):
+        self.append(
+            {"event": EVENT_PARAM, "name": k, "value": normalize_param(v)}
+            for k, v in params.items()
+        )
+
+    def metric(self, name, value, step=None, wall_time=None):
+        self.append([metric_event(name, value, step, wall_time)])
+
+    def close(self):
+        self._file.close()
+
+    def discard(self):
+        """Close and remove the log, e.g. once the run document is written."""
+        self.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _truncate_torn_line(path, block=4096):
+    # drop the unterminated last line a crashed writer may have left, so the
+    # next event starts on a line of its own
+    try:
+        f = path.open(mode="rb+")
+    except FileNotFoundError:
+        return
+    with f:
+        end = f.seek(0, 2)
+        position = end
+        while position > 0:
+            start = max(position - block, 0)
+            f.seek(start)
+            chunk = f.read(position - start)
+            if position == end and chunk.endswith(b"\n"):
+                return
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                f.truncate(start + newline + 1)
+                return
+            position = start
+        f.truncate(0)
+
+
+def metric_event(name, value, step=None, wall_time=None):
+    return {
+        "event": EVENT_METRIC,
+        "name": name,
+        "value": normalize_float(value),
+        "step": step,
+        "time": wall_time,
+    }
+
+
+def read_events(path):
+    with Path(path).open() as f:
+        for line in f:
+            if not line.endswith("\n"):
+                # a torn last line of a crashed writer
+                break
+            try:
+                event = json.loads(line)
+            except ValueError:
+                # e.g. a torn line followed by events of a later writer
+                continue
+            yield event
+
+
+def events_to_run(events):
+    """Materialize a ``Run`` from run log events, later events win."""
+    run_event = {}
+    implementation_event = None
+    params = {}
+    metrics = []
+    for event in events:
+        kind = event["event"]
+        if kind == EVENT_RUN:
+            run_event = event
+        elif kind == EVENT_IMPLEMENTATION:
+            implementation_event = event
+        elif kind == EVENT_PARAM:
+            params[event["name"]] = event["value"]
+        elif kind == EVENT_METRIC:
+            metrics.append(event)
+
+    run_id = run_event.get("id")
+    algorithm = run_event.get("algorithm")
+    if implementation_event is not None and implementation_event["algorithm"]:
+        algorithm = implementation_event["algorithm"]
+    algo = Algorithm(_id=algorithm) if algorithm is not None else None
+
+    hyper_parameters = [HyperParameter(k, model_hash=run_id) for k in params]
+    input_values = [
+        HyperParameterSetting(value=v, specified_by=hp, model_hash=run_id)
+        for hp, v in zip(hyper_parameters, params.values())
+        if v is not None
+    ]
+
+    output_values = []
+    measures = {}
+    positions = {}
+    for event in metrics:
+        name = event["name"]
+        if name not in measures:
+            measures[name] = EvaluationMeasure(
+                _id="http://www.w3.org/ns/mls#{}".format(name)
+            )
+        # the position in the series of the metric, as in MetricLog, steps
+        # may repeat
+        position = positions.get(name, 0)
+        positions[name] = position + 1
+        step = event.get("step")
+        output_values.append(
+            ModelEvaluation(
+                _id="http://www.w3.org/ns/mls#ModelEvaluation.{}.{}.{}".format(
+                    name, position, run_id
+                ),
+                value=event["value"],
+                specified_by=measures[name],
+                step=step,
+            )
+        )
+
+    implementation = None
+    if implementation_event is not None:
+        implementation = Implementation(
+            implementation_event["id"],
+            hyper_parameters,
+            implements=algo,
+            version=implementation_event["version"],
+            name=implementation_event["name"],
+        )
+    return Run(
+        run_id,
+        executes=implementation,
+        input_values=input_values,
+        output_values=output_values,
+        realizes=algo,
+        name=run_event.get("name"),
+    )
+
+
+def compact(path, out_path=None):
+    """Materialize the run log at ``path`` as a JSON-LD document.
+
+    The document is written atomically to ``out_path``, by default the log
+    path with ``.jsonld`` in place of ``.events.jsonl``. Finished runs write
+    their document themselves and ``discard`` the log, this recovers the runs
+    of processes that crashed.
+    """
+    path = Path(path)
+    if out_path is None:
+        name = path.name
+        if name.endswith(EVENTS_SUFFIX):
+            name = name[: -len(EVENTS_SUFFIX)]
+        out_path = path.with_name(name + ".jsonld")
+    return atomic_write(out_path, serializer.dumps(events_to_run(read_events(path))))
@@ -0,0 +1,220 @@
+import contextlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import formats
+from .store import get_run_store, is_document, summarize
+
+RUN_COLUMNS = ("path", "run_id", "algorithm", "version")
+PARAM_PREFIX = "param."
+METRIC_PREFIX = "metric."
+# changed files from which reindex inserts without secondary indexes
+BULK_THRESHOLD = 1000
+
+
+class ScanSummary:
+    """Outcome of a ``reindex``."""
+
+    def __init__(self, files, parsed, skipped, failed, removed, seconds):
+        self.files = files
+        self.parsed = parsed
+        self.skipped = skipped
+        self.failed = failed
+        self.removed = removed
+        self.seconds = seconds
+
+    @property
+    def files_per_second(self):
+        """Files scanned, parsed or skipped, per second."""
+        return self.files / self.seconds if self.seconds else 0.0
+
+    @property
+    def parsed_per_second(self):
+        return self.parsed / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return (
+            "ScanSummary(files={}, parsed={}, skipped={}, failed={}, removed={}, "
+            "seconds={:.3f}, files_per_second={:.1f}, parsed_per_second={:.1f})".format(
+                self.files,
+                self.parsed,
+                self.skipped,
+                self.failed,
+                self.removed,
+                self.seconds,
+                self.files_per_second,
+                self.parsed_per_second,
+            )
+        )
+
+
+def print_progress(done, total, seconds, file=None):
+    """A ``progress`` callback writing a status line to stderr."""
+    file = file or sys.stderr
+    file.write(
+        "\rparsed {}/{} files, {:.0f} files/s".format(
+            done, total, done / seconds if seconds else 0.0
+        )
+    )
+    if done == total:
+        file.write("\n")
+    file.flush()
+
+
+def _summarize_file(path):
+    try:
+        return summarize(formats.load(path))
+    except Exception:  # pylint: disable=W0703
+        # e.g. a document still being written by another process
+        return None
+
+
+def _iter_summaries(paths, workers, chunksize):
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) <= chunksize:
+        return map(_summarize_file, paths), None
+    pool = ProcessPoolExecutor(max_workers=workers)
+    return pool.map(_summarize_file, paths, chunksize=chunksize), pool
+
+
+def _index_all(store, changed, summaries, chunksize, progress, start):
+    failed = 0
+    done = 0
+    batch = []
+    for (path, stat), summary in zip(changed, summaries):
+        done += 1
+        if summary is None:
+            failed += 1
+        else:
+            batch.append((path, summary, stat))
+        if len(batch) == chunksize or done == len(changed):
+            store.index_summaries(batch)
+            batch = []
+            if progress is not None:
+                progress(done, len(changed), time.perf_counter() - start)
+    return failed
+
+
+def reindex(
+    directory,
+    store=None,
+    full=False,
+    workers=None,
+    chunksize=64,
+    progress=None,
+    bulk_threshold=BULK_THRESHOLD,
+):
+    """Bring the ``store.RunStore`` of ``directory`` up to date.
+
+    The directory is listed with ``os.scandir``, files whose mtime and size
+    are indexed already are skipped unless ``full``. The others are parsed
+    on a pool of ``workers`` processes (one per CPU by default) and indexed
+    ``chunksize`` files per transaction, runs of removed files are dropped.
+    Unreadable files are counted as failed and retried on the next call.
+    ``progress(done, total, seconds)`` is called after each transaction,
+    see ``print_progress``.
+
+    From ``bulk_threshold`` changed files, and at least half as many as are
+    indexed, e.g. on a first scan, the runs are inserted without the
+    secondary indexes of the store, which are rebuilt at the end, see
+    ``store.RunStore.bulk_insert``. Queries of other processes are slow
+    meanwhile.
+    """
+    start = time.perf_counter()
+    if store is None:
+        store = get_run_store(directory)
+    indexed = store.fingerprints()
+    changed = []
+    seen = set()
+    with os.scandir(str(directory)) as entries:
+        for entry in entries:
+            if not entry.is_file() or not is_document(entry.name):
+                continue
+            path = os.path.abspath(entry.path)
+            seen.add(path)
+            stat = entry.stat()
+            if full or indexed.get(path) != (stat.st_mtime, stat.st_size):
+                changed.append((path, stat))
+
+    paths = [path for path, _ in changed]
+    bulk = len(changed) >= bulk_threshold and 2 * len(changed) >= len(indexed)
+    summaries, pool = _iter_summaries(paths, workers, chunksize)
+    try:
+        with store.bulk_insert(paths) if bulk else contextlib.nullcontext():
+            failed = _index_all(store, changed, summaries, chunksize, progress, start)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    removed = indexed.keys() - seen
+    store.remove_paths(removed)
+    return ScanSummary(
+        len(seen),
+        len(changed) - failed,
+        len(seen) - len(changed),
+        failed,
+        len(removed),
+        time.perf_counter() - start,
+    )
+
+
+def _value_column(values, size):
+    if all(type(v) is float for v in values.values()):
+        column = np.full(size, np.nan)
+    else:
+        column = np.full(size, None, dtype=object)
+    for row, value in values.items():
+        column[row] = value
+    return column
+
+
+def table(store, hyperparameters=None, metrics=None):
+    """Columns of the runs indexed in ``store``, one row per run.
+
+    Returns ``{name: array}`` with the ``RUN_COLUMNS``, then one
+    ``param.<name>`` column per hyperparameter and one ``metric.<name>``
+    column per metric, only ``hyperparameters`` and ``metrics`` if given.
+    Numeric columns are ``float64`` with NaN for missing values, the others
+    ``object`` arrays with ``None``. ``pyarrow.table`` accepts it as is,
+    ``to_records`` gives a NumPy structured array.
+    """
+    runs, params, values = store.rows(hyperparameters, metrics)
+    rows = {run[0]: index for index, run in enumerate(runs)}
+    columns = {
+        name: np.array([run[i + 1] for run in runs], dtype=object)
+        for i, name in enumerate(RUN_COLUMNS)
+    }
+    for prefix, entries in ((PARAM_PREFIX, params), (METRIC_PREFIX, values)):
+        by_name = {}
+        for run, name, value in entries:
+            by_name.setdefault(name, {})[rows[run]] = value
+        for name in sorted(by_name):
+            columns[prefix + name] = _value_column(by_name[name], len(runs))
+    return columns
+
+
+def to_records(columns):
+    """The ``table`` columns as a NumPy structured array."""
+    return np.rec.fromarrays(
+        list(columns.values()),
+        dtype=[(name, column.dtype) for name, column in columns.items()],
+    )
+
+
+def scan(
+    directory,
+    hyperparameters=None,
+    metrics=None,
+    full=False,
+    workers=None,
+    chunksize=64,
+    progress=None,
+):
+    """``reindex`` ``directory`` and return its ``table`` and ``ScanSummary``."""
+    store = get_run_store(directory)
+    summary = reindex(directory, store, full, workers, chunksize, progress)
+    return table(store, hyperparameters, metrics), summary
@@ -0,0 +1,360 @@
+import io
+import json
+from functools import lru_cache
+from json.encoder import encode_basestring_ascii
+
+import calamus.fields as fields
+import marshmallow.fields as msmlfields
+from calamus.utils import normalize_type
+
+from .common import xsd_type
+from .models import ParameterValue, RunSchema, get_schema
+
+ENGINE_CALAMUS = "calamus"
+ENGINE_COMPILED = "compiled"
+ENGINES = (ENGINE_CALAMUS, ENGINE_COMPILED)
+
+_missing = object()
+_engine = ENGINE_CALAMUS
+
+_FLOAT_REPR = float.__repr__
+_INFINITY = float("inf")
+_XSD_PREFIX = {
+    bool: '{"@type": "xsd:boolean", "@value": ',
+    int: '{"@type": "xsd:int", "@value": ',
+    float: '{"@type": "xsd:float", "@value": ',
+    str: '{"@type": "xsd:string", "@value": ',
+}
+_XSD_ANY_URI = '{"@type": "xsd:anyURI", "@value": '
+
+
+def set_engine(engine):
+    """Select the serializer engine used by ``dumps`` when none is given."""
+    global _engine
+    if engine not in ENGINES:
+        raise ValueError("unknown serializer engine {}".format(engine))
+    _engine = engine
+
+
+def get_engine():
+    return _engine
+
+
+def _string(value):
+    return None if value is None else str(value)
+
+
+def _typed_string(value):
+    return {
+        "@value": _string(value),
+        "@type": "http://www.w3.org/2001/XMLSchema#string",
+    }
+
+
+def _typed_integer(value):
+    return {
+        "@value": None if value is None else int(value),
+        "@type": "http://www.w3.org/2001/XMLSchema#integer",
+    }
+
+
+def _integer(value):
+    return None if value is None else int(value)
+
+
+def _compile_field(field, add_value_types):
+    if isinstance(field, fields.Id):
+        return _string
+    elif isinstance(field, fields.Nested):
+        if len(field.nested) != 1:
+            raise NotImplementedError(
+                "can't compile polymorphic nested field {}".format(field.data_key)
+            )
+        only = tuple(field.only) if field.only is not None else None
+        emit = compile_schema(field.nested[0], only)
+        if field.many:
+            return lambda value: None if value is None else [emit(v) for v in value]
+        return lambda value: None if value is None else emit(value)
+    elif isinstance(field, ParameterValue):
+        return xsd_type if add_value_types else lambda value: value
+    elif isinstance(field, fields.String):
+        if add_value_types or field.add_value_types:
+            return _typed_string
+        return _string
+    elif isinstance(field, msmlfields.String):
+        return _string
+    elif isinstance(field, fields.Integer):
+        if add_value_types or field.add_value_types:
+            return _typed_integer
+        return _integer
+    raise NotImplementedError(
+        "can't compile field {} of type {}".format(field.data_key, type(field))
+    )
+
+
+@lru_cache(maxsize=None)
+def compile_schema(schema_class, only=None):
+    """Compile a calamus schema into a function emitting its JSON-LD dict.
+
+    The emitted dict has the same keys, in the same order, as
+    ``schema_class(only=only).dump(obj)``.
+    """
+    opts = schema_class.opts
+    declared = schema_class._declared_fields
+    names = only if only is not None else tuple(declared)
+    steps = tuple(
+        (
+            name,
+            declared[name].data_key,
+            _compile_field(declared[name], opts.add_value_types),
+        )
+        for name in names
+    )
+    rdf_type = normalize_type(opts.rdf_type)
+    id_generation_strategy = opts.id_generation_strategy
+
+    def emit(obj):
+        ret = {}
+        for attr, key, convert in steps:
+            value = getattr(obj, attr, _missing)
+            if value is _missing:
+                continue
+            ret[key] = convert(value)
+        if not ret.get("@id"):
+            ret["@id"] = id_generation_strategy(ret, obj)
+        ret["@type"] = list(rdf_type)
+        return ret
+
+    return emit
+
+
+def _encode_value(value):
+    """Encode ``value`` exactly like ``json.dumps`` with default options."""
+    value_type = type(value)
+    if value_type is str:
+        return encode_basestring_ascii(value)
+    elif value is None:
+        return "null"
+    elif value is True:
+        return "true"
+    elif value is False:
+        return "false"
+    elif value_type is int:
+        return int.__repr__(value)
+    elif value_type is float:
+        if value != value:
+            return "NaN"
+        elif value == _INFINITY:
+            return "Infinity"
+        elif value == -_INFINITY:
+            return "-Infinity"
+        return _FLOAT_REPR(value)
+    return json.dumps(value)
+
+
+def _encode_string(value):
+    if type(value) is str:
+        return encode_basestring_ascii(value)
+    return "null" if value is None else encode_basestring_ascii(str(value))
+
+
+def _encode_typed_value(value):
+    return _XSD_PREFIX.get(type(value), _XSD_ANY_URI) + _encode_value(value) + "}"
+
+
+def _compile_text_field(field, add_value_types):
+    if isinstance(field, fields.Id):
+        return _encode_string
+    elif isinstance(field, fields.Nested):
+        only = tuple(field.only) if field.only is not None else None
+        emit = compile_schema_text(field.nested[0], only)
+        if field.many:
+
+            def emit_many(value):
+                if value is None:
+                    return "null"
+                return "[" + ", ".join([emit(v) for v in value]) + "]"
+
+            return emit_many
+        return lambda value: "null" if value is None else emit(value)
+    elif isinstance(field, ParameterValue):
+        return _encode_typed_value if add_value_types else _encode_value
+    elif isinstance(field, fields.String) and (
+        add_value_types or field.add_value_types
+    ):
+        return lambda value: json.dumps(_typed_string(value))
+    elif isinstance(field, fields.Integer):
+        if add_value_types or field.add_value_types:
+            return lambda value: json.dumps(_typed_integer(value))
+        return lambda value: _encode_value(_integer(value))
+    return _encode_string
+
+
+@lru_cache(maxsize=None)
+def compile_schema_text(schema_class, only=None):
+    """Compile a calamus schema into a function emitting its JSON-LD text.
+
+    The emitted string is identical to
+    ``json.dumps(schema_class(only=only).dump(obj))``.
+    """
+    emit_dict = compile_schema(schema_class, only)
+    opts = schema_class.opts
+    declared = schema_class._declared_fields
+    names = only if only is not None else tuple(declared)
+    steps = []
+    id_attr = None
+    for name in names:
+        field = declared[name]
+        if isinstance(field, fields.Id):
+            id_attr = name
+        steps.append(
+            (
+                name,
+                encode_basestring_ascii(field.data_key) + ": ",
+                _compile_text_field(field, opts.add_value_types),
+            )
+        )
+    rdf_type = '"@type": ' + json.dumps(normalize_type(opts.rdf_type)) + "}"
+    if id_attr is None or steps[0][0] != id_attr:
+
+        def emit(obj):
+            if id_attr is None or not getattr(obj, id_attr, None):
+                # blank node ids are generated on the fly, defer to the dict
+                # emitter
+                return json.dumps(emit_dict(obj))
+            parts = []
+            for attr, key, convert in steps:
+                value = getattr(obj, attr, _missing)
+                if value is _missing:
+                    continue
+                parts.append(key + convert(value))
+            parts.append(rdf_type)
+            return "{" + ", ".join(parts)
+
+        return emit
+
+    # the id comes first, read it once
+    id_key = "{" + steps[0][1]
+    steps = tuple(steps[1:])
+    if not steps:
+        # e.g. a reference to a node by its id only
+        rdf_type = ", " + rdf_type
+
+        def emit_id(obj):
+            _id = getattr(obj, id_attr, None)
+            if not _id:
+                return json.dumps(emit_dict(obj))
+            return id_key + _encode_string(_id) + rdf_type
+
+        return emit_id
+
+    def emit_node(obj):
+        _id = getattr(obj, id_attr, None)
+        if not _id:
+            return json.dumps(emit_dict(obj))
+        parts = [id_key + _encode_string(_id)]
+        for attr, key, convert in steps:
+            value = getattr(obj, attr, _missing)
+            if value is _missing:
+                continue
+            parts.append(key + convert(value))
+        parts.append(rdf_type)
+        return ", ".join(parts)
+
+    return emit_node
+
+
+@lru_cache(maxsize=None)
+def compile_schema_chunks(schema_class, only=None):
+    """Compile a calamus schema into a generator of its JSON-LD text.
+
+    The chunks join to the string emitted by ``compile_schema_text``, the
+    items of ``many`` nested fields (e.g. ``hasInput`` and ``hasOutput``)
+    are emitted one chunk each, so they may be consumed from iterators.
+    """
+    emit_dict = compile_schema(schema_class, only)
+    opts = schema_class.opts
+    declared = schema_class._declared_fields
+    names = only if only is not None else tuple(declared)
+    steps = []
+    id_attr = None
+    for name in names:
+        field = declared[name]
+        if isinstance(field, fields.Id):
+            id_attr = name
+        many = isinstance(field, fields.Nested) and field.many
+        if many:
+            only_nested = tuple(field.only) if field.only is not None else None
+            convert = compile_schema_text(field.nested[0], only_nested)
+        else:
+            convert = _compile_text_field(field, opts.add_value_types)
+        steps.append(
+            (name, encode_basestring_ascii(field.data_key) + ": ", convert, many)
+        )
+    steps = tuple(steps)
+    rdf_type = '"@type": ' + json.dumps(normalize_type(opts.rdf_type)) + "}"
+
+    def emit(obj):
+        if id_attr is None or not getattr(obj, id_attr, None):
+            yield json.dumps(emit_dict(obj))
+            return
+        separator = "{"
+        for attr, key, convert, many in steps:
+            value = getattr(obj, attr, _missing)
+            if value is _missing:
+                continue
+            if many and value is not None:
+                yield separator + key + "["
+                item_separator = ""
+                for item in value:
+                    yield item_separator + convert(item)
+                    item_separator = ", "
+                yield "]"
+            elif many:
+                yield separator + key + "null"
+            else:
+                yield separator + key + convert(value)
+            separator = ", "
+        yield separator + rdf_type
+
+    return emit
+
+
+def iter_dumps(obj, schema_class=RunSchema):
+    """Serialize ``obj`` to JSON-LD text chunks, see ``compile_schema_chunks``.
+
+    Always uses the compiled engine, the output is identical to ``dumps``.
+    """
+    return compile_schema_chunks(schema_class)(obj)
+
+
+def dump_to(obj, fp, schema_class=RunSchema, binary=None):
+    """Serialize ``obj`` incrementally to the writable ``fp``.
+
+    ``fp`` is a text or binary file-like object, e.g. an open file, a
+    ``gzip`` stream or ``socket.makefile("wb")``. Only one ``hasInput`` or
+    ``hasOutput`` entry is held as text at a time. ``binary`` is guessed
+    from the type of ``fp`` by default, pass it for binary writers that are
+    not ``io`` objects.
+    """
+    if binary is None:
+        binary = not isinstance(fp, io.TextIOBase) and isinstance(
+            fp, (io.RawIOBase, io.BufferedIOBase)
+        )
+    write = fp.write
+    for chunk in iter_dumps(obj, schema_class):
+        # the output is ASCII, non ASCII characters are escaped
+        write(chunk.encode("ascii") if binary else chunk)
+
+
+def dump(obj, schema_class=RunSchema, engine=None):
+    if (engine or _engine) == ENGINE_COMPILED:
+        return compile_schema(schema_class)(obj)
+    return get_schema(schema_class).dump(obj)
+
+
+def dumps(obj, schema_class=RunSchema, engine=None):
+    """Serialize ``obj`` to a JSON-LD string with the selected engine."""
+    if (engine or _engine) == ENGINE_COMPILED:
+        return compile_schema_text(schema_class)(obj)
+    return get_schema(schema_class).dumps(obj)
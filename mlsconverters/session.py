@@ -1,52 +1,213 @@
-from uuid import uuid1
+import itertools
+import multiprocessing
+import queue
+import threading
 
 from . import io
-from .common import generate_unique_id
-from .models import (Algorithm, EvaluationMeasure, HyperParameter,
-                     HyperParameterSetting, Implementation, ModelEvaluation,
-                     Run, RunSchema)
+from .common import generate_unique_id, new_id
+from .metrics import AGGREGATE_SERIES, AGGREGATIONS, MetricLog
+
+
+class _Buffer:
+    """Params and metrics logged by one thread or process."""
+
+    def __init__(self):
+        self.hp = dict()
+        self.metrics = MetricLog()
+        self.evaluations = []
+        self.step = 0
+
+    def log_metrics(self, metrics, step=None):
+        if step is None:
+            step = self.step
+        self.step = step + 1
+        self.metrics.log(metrics, step)
+
+    def metric(self, metric_name, value):
+        from .models import EvaluationMeasure, ModelEvaluation
+
+        _id = generate_unique_id("http://www.w3.org/ns/mls#ModelEvaluation")
+        self.evaluations.append(
+            ModelEvaluation(
+                _id=_id,
+                value=value,
+                specified_by=EvaluationMeasure(
+                    _id="http://www.w3.org/ns/mls#{}".format(metric_name)
+                ),
+            )
+        )
+
+
+def _appending(nodes, to):
+    for node in nodes:
+        to.append(node)
+        yield node
 
 
 class Session:
-    def __init__(self, name, run_id=None):
+    """Log the parameters and metrics of a run, written out on exit.
+
+    Metrics from ``log_metrics`` are kept in columnar buffers and only turned
+    into ``ModelEvaluation`` nodes on exit, according to ``aggregation``:
+    ``"series"`` (every point, or ``max_points`` evenly spaced ones),
+    ``"last"``, ``"min"`` or ``"max"``.
+
+    A session can be shared between threads, each thread logs to its own
+    buffer and the buffers are merged on exit. Child processes log through
+    ``remote``.
+    """
+
+    def __init__(
+        self, name, run_id=None, aggregation=AGGREGATE_SERIES, max_points=None
+    ):
+        if aggregation not in AGGREGATIONS:
+            raise ValueError("unknown aggregation {}".format(aggregation))
         self._name = name
-        self._run_id = uuid1().fields[0] if run_id is None else run_id
-        self._run = Run(self._run_id)
-        self._run.realizes = Algorithm(self._name)
-        self._hp = dict()
+        self._run_id = new_id() if run_id is None else run_id
+        self._aggregation = aggregation
+        self._max_points = max_points
+        self._local = threading.local()
+        self._buffers = []
+        self._lock = threading.Lock()
+        self._manager = None
+        self._queue = None
 
     def __enter__(self):
         return self
 
     def __exit__(self, type, value, traceback):
+        # the object model loads calamus, only needed here
+        from .models import (Algorithm, HyperParameter, HyperParameterSetting,
+                             Implementation, Run)
+
+        self._run = Run(self._run_id, realizes=Algorithm(self._name))
+        buffers = self._collect()
+        hps = dict()
+        for buffer in buffers:
+            hps.update(buffer.hp)
+
         params = []
-        for k, v in self._hp.items():
+        for k, v in hps.items():
             hp = HyperParameter(k, model_hash=self._run._id)
             params.append(hp)
             self._run.input_values.append(
                 HyperParameterSetting(v, hp, model_hash=self._run._id)
             )
         self._run.executes = Implementation(
-            generate_unique_id("http://www.w3.org/ns/mls#Implementation"),
+            generate_unique_id(
+                "http://www.w3.org/ns/mls#Implementation", content=[self._name, hps]
+            ),
             params,
             implements=self._run.realizes,
         )
-        io.log_renku_mls(RunSchema().dumps(self._run), str(self._run_id), force=True)
+        outputs = self._run.output_values
+        for buffer in buffers:
+            outputs.extend(buffer.evaluations)
+        metrics = MetricLog.merge(buffer.metrics for buffer in buffers)
+        evaluations = metrics.iter_evaluations(
+            self._run_id, self._aggregation, self._max_points
+        )
+        # metric nodes are created while the document is streamed to disk,
+        # the run gets them back as a list afterwards
+        self._run.output_values = itertools.chain(
+            list(outputs), _appending(evaluations, outputs)
+        )
+        try:
+            io.log_renku_run(self._run, str(self._run_id), force=True)
+        finally:
+            outputs.extend(evaluations)
+            self._run.output_values = outputs
+
+    def _buffer(self):
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = _Buffer()
+            with self._lock:
+                self._buffers.append(buffer)
+        return buffer
+
+    def _collect(self):
+        """Thread buffers followed by those sent by child processes."""
+        with self._lock:
+            buffers = list(self._buffers)
+        if self._queue is not None:
+            while True:
+                try:
+                    buffers.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._manager.shutdown()
+            self._manager = self._queue = None
+        return buffers
+
+    def remote(self):
+        """Return a picklable ``RemoteSession`` for child processes.
+
+        What is logged to it is sent back to this session when the remote
+        session is flushed or exited, and ends up in the same run document.
+        """
+        with self._lock:
+            if self._queue is None:
+                self._manager = multiprocessing.Manager()
+                self._queue = self._manager.Queue()
+        return RemoteSession(self._queue)
 
     def param(self, param_name, value):
-        self._hp.update({param_name: value})
+        self._buffer().hp.update({param_name: value})
 
     def params(self, params):
-        self._hp.update(params)
+        self._buffer().hp.update(params)
 
     def metric(self, metric_name, value):
-        _id = generate_unique_id("http://www.w3.org/ns/mls#ModelEvaluation")
-        self._run.output_values.append(
-            ModelEvaluation(
-                _id=_id,
-                value=value,
-                specified_by=EvaluationMeasure(
-                    _id="http://www.w3.org/ns/mls#{}".format(metric_name)
-                ),
-            )
-        )
+        self._buffer().metric(metric_name, value)
+
+    def log_metrics(self, metrics, step=None):
+        """Log a dict of metric values at ``step``.
+
+        Without ``step`` the step after the last one logged by this thread
+        is used.
+        """
+        self._buffer().log_metrics(metrics, step)
+
+
+class RemoteSession:
+    """Stand-in for a ``Session`` in a child process, see ``Session.remote``.
+
+    Params and metrics are buffered locally and sent to the parent session
+    by ``flush``, which also runs on exit.
+    """
+
+    def __init__(self, queue):
+        self._queue = queue
+        self._buffer = _Buffer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.flush()
+
+    def __getstate__(self):
+        return {"_queue": self._queue}
+
+    def __setstate__(self, state):
+        self.__init__(state["_queue"])
+
+    def flush(self):
+        buffer = self._buffer
+        if buffer.hp or buffer.evaluations or len(buffer.metrics):
+            self._queue.put(buffer)
+            self._buffer = _Buffer()
+            self._buffer.step = buffer.step
+
+    def param(self, param_name, value):
+        self._buffer.hp.update({param_name: value})
+
+    def params(self, params):
+        self._buffer.hp.update(params)
+
+    def metric(self, metric_name, value):
+        self._buffer.metric(metric_name, value)
+
+    def log_metrics(self, metrics, step=None):
+        self._buffer.log_metrics(metrics, step)
@@ -0,0 +1,483 @@
+import argparse
+import contextlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+from . import formats, loader
+
+STORE_NAME = ".runs.sqlite"
+
+OPERATORS = ("=", "!=", "<", "<=", ">", ">=")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    run_id TEXT,
+    algorithm TEXT,
+    version TEXT,
+    mtime REAL,
+    size INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_path ON runs (path);
+CREATE TABLE IF NOT EXISTS params (
+    run INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    value_num REAL,
+    value_text TEXT
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    value REAL
+);
+"""
+# dropped while bulk inserting, see ``RunStore.bulk_insert``
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS runs_algorithm ON runs (algorithm);
+CREATE INDEX IF NOT EXISTS runs_version ON runs (version);
+CREATE INDEX IF NOT EXISTS params_run ON params (run, name, value_num, value_text);
+CREATE INDEX IF NOT EXISTS params_num ON params (name, value_num, run)
+    WHERE value_num IS NOT NULL;
+CREATE INDEX IF NOT EXISTS params_text ON params (name, value_text, run)
+    WHERE value_text IS NOT NULL;
+CREATE INDEX IF NOT EXISTS metrics_run ON metrics (run, name, value);
+CREATE INDEX IF NOT EXISTS metrics_value ON metrics (name, value, run);
+"""
+_INDEX_NAMES = (
+    "runs_algorithm",
+    "runs_version",
+    "params_run",
+    "params_num",
+    "params_text",
+    "metrics_run",
+    "metrics_value",
+)
+
+
+def _is_number(value):
+    return type(value) in (int, float, bool)
+
+
+def _param_columns(value):
+    if _is_number(value):
+        return float(value), None
+    if value is None or isinstance(value, str):
+        return None, value
+    return None, json.dumps(value, sort_keys=True)
+
+
+def _runs(document):
+    """The ``RunDocument``s of a decoded document, also of ``@graph``s."""
+    if "@graph" in document:
+        return [loader.RunDocument(d) for d in document["@graph"]]
+    return [loader.RunDocument(document)]
+
+
+def summarize(document):
+    """``(run_id, algorithm, version, hyperparameters, metrics)`` of each run
+    of a decoded document, what ``RunStore`` indexes."""
+    return [_summary(run) for run in _runs(document)]
+
+
+def _summary(run):
+    implementation = run.document.get(loader.EXECUTES) or {}
+    algorithm = run.algorithm
+    if algorithm is None:
+        implements = implementation.get(loader.IMPLEMENTS) or {}
+        algorithm = implements.get(loader.LABEL, implements.get(loader.ID))
+    version = implementation.get(loader.HAS_VERSION, run.version)
+    return (
+        None if run._id is None else str(run._id),
+        algorithm,
+        version,
+        run.hyperparameters(),
+        {k: v for k, v in run.metrics().items() if _is_number(v)},
+    )
+
+
+def _fingerprint(stat):
+    return (stat.st_mtime, stat.st_size) if stat is not None else (None, None)
+
+
+def is_document(name):
+    return any(name.endswith(formats.suffix(fmt)) for fmt in formats.FORMATS)
+
+
+def _names_filter(names):
+    if names is None:
+        return "", []
+    names = list(names)
+    return " WHERE name IN ({})".format(", ".join("?" * len(names))), names
+
+
+def _condition(condition):
+    if isinstance(condition, tuple):
+        operator, value = condition
+        if operator not in OPERATORS:
+            raise ValueError("unknown operator {}".format(operator))
+        return operator, value
+    return "=", condition
+
+
+class RunStore:
+    """SQLite index of the MLS documents of a directory.
+
+    Indexes per run the algorithm, the library version, the hyperparameter
+    values and the last value of each evaluation measure, so ``query`` does
+    not open any document. Numeric hyperparameters compare as numbers,
+    others as text (JSON for lists and dicts). Documents are added with
+    ``index_file`` or ``index_document`` when written, ``rebuild`` catches
+    up with a directory, skipping files whose mtime and size are indexed.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        # the indexes are also restored after an interrupted bulk insert
+        self._connection.executescript(_SCHEMA + _INDEXES)
+        self._lock = threading.Lock()
+        self._bulk_paths = frozenset()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def _remove(self, path):
+        c = self._connection
+        ids = [
+            row[0] for row in c.execute("SELECT id FROM runs WHERE path = ?", (path,))
+        ]
+        if ids:
+            marks = ", ".join("?" * len(ids))
+            c.execute("DELETE FROM params WHERE run IN ({})".format(marks), ids)
+            c.execute("DELETE FROM metrics WHERE run IN ({})".format(marks), ids)
+            c.execute("DELETE FROM runs WHERE id IN ({})".format(marks), ids)
+
+    def _insert(self, items):
+        c = self._connection
+        param_rows = []
+        metric_rows = []
+        for path, summaries, stat in items:
+            path = os.path.abspath(path)
+            mtime, size = _fingerprint(stat)
+            if path not in self._bulk_paths:
+                self._remove(path)
+            for run_id, algorithm, version, params, metrics in summaries:
+                row = c.execute(
+                    "INSERT INTO runs (path, run_id, algorithm, version, mtime, size)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (path, run_id, algorithm, version, mtime, size),
+                ).lastrowid
+                param_rows += [(row, k) + _param_columns(v) for k, v in params.items()]
+                metric_rows += [(row, k, v) for k, v in metrics.items()]
+        c.executemany("INSERT INTO params VALUES (?, ?, ?, ?)", param_rows)
+        c.executemany("INSERT INTO metrics VALUES (?, ?, ?)", metric_rows)
+
+    @contextlib.contextmanager
+    def bulk_insert(self, paths):
+        """Index many files at once, e.g. when a directory is first scanned.
+
+        What was indexed for ``paths`` is removed up front, the secondary
+        indexes are dropped while the runs are inserted and rebuilt once at
+        the end. That about halves the insert time, but queries are slow
+        until the block is left and rebuilding the indexes costs time in
+        proportion to the whole store, so it only pays for large batches.
+        """
+        paths = frozenset(os.path.abspath(path) for path in paths)
+        with self._lock, self._connection:
+            for path in paths:
+                self._remove(path)
+            for name in _INDEX_NAMES:
+                self._connection.execute("DROP INDEX IF EXISTS {}".format(name))
+            self._bulk_paths = paths
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._bulk_paths = frozenset()
+                self._connection.executescript(_INDEXES)
+
+    def index_document(self, path, document, stat=None):
+        """Index the decoded ``document`` written to ``path``, replacing what
+        was indexed for ``path`` before."""
+        self.index_documents([(path, document, stat)])
+
+    def index_documents(self, items):
+        """Index ``(path, document, stat)`` items in one transaction."""
+        self.index_summaries(
+            (path, summarize(document), stat) for path, document, stat in items
+        )
+
+    def index_summaries(self, items):
+        """Index ``(path, summaries, stat)`` items in one transaction, see
+        ``summarize``."""
+        with self._lock, self._connection:
+            self._insert(items)
+
+    def index_file(self, path):
+        path = Path(path)
+        self.index_document(path, formats.load(path), path.stat())
+
+    def remove(self, path):
+        self.remove_paths([path])
+
+    def fingerprints(self):
+        """``{path: (mtime, size)}`` of the indexed files."""
+        with self._lock:
+            return {
+                path: (mtime, size)
+                for path, mtime, size in self._connection.execute(
+                    "SELECT path, mtime, size FROM runs"
+                )
+            }
+
+    def remove_paths(self, paths):
+        with self._lock, self._connection:
+            for path in paths:
+                self._remove(os.path.abspath(path))
+
+    def rebuild(self, directory, full=False, workers=None, progress=None):
+        """Index the documents of ``directory``, drop runs of removed files.
+
+        Without ``full`` unchanged files are skipped. Files are parsed on
+        ``workers`` processes, see ``scanner.reindex``. Returns the number
+        of indexed files.
+        """
+        from .scanner import reindex
+
+        return reindex(
+            directory, self, full=full, workers=workers, progress=progress
+        ).parsed
+
+    def query(
+        self,
+        algorithm=None,
+        version=None,
+        params=None,
+        metrics=None,
+        order_by=None,
+        descending=True,
+        limit=None,
+    ):
+        """Find indexed runs.
+
+        ``algorithm`` matches exactly or as a SQL ``LIKE`` pattern if it
+        contains ``%``. ``params`` and ``metrics`` map names to a value or
+        an ``(operator, value)`` condition, see ``OPERATORS``. ``order_by``
+        is a metric name, runs without it are left out then. Returns dicts
+        with the run ``path``, ``run_id``, ``algorithm``, ``version`` and the
+        ``value`` of the ``order_by`` metric.
+        """
+        where = []
+        where_args = []
+        if algorithm is not None:
+            where.append(
+                "r.algorithm LIKE ?" if "%" in algorithm else "r.algorithm = ?"
+            )
+            where_args.append(algorithm)
+        if version is not None:
+            where.append("r.version = ?")
+            where_args.append(version)
+
+        # (table, alias, test, args), runs hold one value per name
+        terms = []
+        for index, (name, condition) in enumerate((params or {}).items()):
+            operator, value = _condition(condition)
+            alias = "p{}".format(index)
+            if value is None:
+                test = "{0}.value_num IS NULL AND {0}.value_text IS ?"
+            elif _is_number(value):
+                test = "{0}.value_num " + operator + " ?"
+                value = float(value)
+            else:
+                test = "{0}.value_text " + operator + " ?"
+                if not isinstance(value, str):
+                    value = json.dumps(value, sort_keys=True)
+            test = "{0}.name = ? AND " + test
+            terms.append(("params", alias, test.format(alias), [name, value]))
+        for index, (name, condition) in enumerate((metrics or {}).items()):
+            operator, value = _condition(condition)
+            alias = "m{}".format(index)
+            test = "{0}.name = ? AND {0}.value " + operator + " ?"
+            terms.append(("metrics", alias, test.format(alias), [name, value]))
+
+        with self._lock:
+            if order_by is not None:
+                # walk the metric index in order, the other terms are lookups
+                terms.insert(0, ("metrics", "m", "m.name = ?", [order_by]))
+                first, join = None, "JOIN"
+            else:
+                first, terms = self._first_term(terms, where, where_args)
+                join = "CROSS JOIN"
+
+            sql = [
+                "SELECT r.path, r.run_id, r.algorithm, r.version, {}".format(
+                    "NULL" if order_by is None else "m.value"
+                )
+            ]
+            args = []
+            if first is None:
+                sql.append("FROM runs r")
+            else:
+                table, alias, test, term_args = first
+                sql.append(
+                    "FROM {0} {1} CROSS JOIN runs r ON r.id = {1}.run".format(
+                        table, alias
+                    )
+                )
+                where = [test] + where
+                where_args = term_args + where_args
+            for table, alias, test, term_args in terms:
+                sql.append(
+                    "{0} {1} {2} ON {2}.run = r.id AND {3}".format(
+                        join, table, alias, test
+                    )
+                )
+                args += term_args
+            if where:
+                sql.append("WHERE " + " AND ".join(where))
+                args += where_args
+            if order_by is not None:
+                sql.append(
+                    "ORDER BY m.value {}".format("DESC" if descending else "ASC")
+                )
+            if limit is not None:
+                sql.append("LIMIT ?")
+                args.append(limit)
+            rows = self._connection.execute(" ".join(sql), args).fetchall()
+        return [
+            {
+                "path": path,
+                "run_id": run_id,
+                "algorithm": algorithm,
+                "version": version,
+                "value": value,
+            }
+            for path, run_id, algorithm, version, value in rows
+        ]
+
+    def _first_term(self, terms, where, where_args):
+        """Split off the term matching the fewest runs to start the join from,
+        ``None`` to start from the runs table.
+
+        Without statistics SQLite may start from a range matching most runs
+        and probe the other terms for each of them.
+        """
+        if not terms:
+            return None, terms
+        c = self._connection
+        counts = [
+            c.execute(
+                "SELECT COUNT(*) FROM {} {} WHERE {}".format(table, alias, test), args
+            ).fetchone()[0]
+            for table, alias, test, args in terms
+        ]
+        order = sorted(range(len(terms)), key=counts.__getitem__)
+        terms = [terms[i] for i in order]
+        if where and not any("LIKE" in w for w in where):
+            # LIKE scans the whole table, never start from it
+            runs_count = c.execute(
+                "SELECT COUNT(*) FROM runs r WHERE " + " AND ".join(where), where_args
+            ).fetchone()[0]
+            if runs_count <= counts[order[0]]:
+                return None, terms
+        return terms[0], terms[1:]
+
+    def rows(self, hyperparameters=None, metrics=None):
+        """All indexed ``(id, path, run_id, algorithm, version)`` runs and
+        their ``(id, name, value)`` hyperparameters and metrics, only the
+        ``hyperparameters`` and ``metrics`` names if given."""
+        params_sql, params_args = _names_filter(hyperparameters)
+        metrics_sql, metrics_args = _names_filter(metrics)
+        with self._lock:
+            c = self._connection
+            runs = c.execute(
+                "SELECT id, path, run_id, algorithm, version FROM runs ORDER BY id"
+            ).fetchall()
+            params = c.execute(
+                "SELECT run, name, COALESCE(value_num, value_text) FROM params"
+                + params_sql,
+                params_args,
+            ).fetchall()
+            values = c.execute(
+                "SELECT run, name, value FROM metrics" + metrics_sql, metrics_args
+            ).fetchall()
+        return runs, params, values
+
+    def hyperparameters(self, path):
+        """The indexed hyperparameters of the runs of ``path``."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT p.name, p.value_num, p.value_text FROM params p"
+                " JOIN runs r ON p.run = r.id WHERE r.path = ?",
+                (os.path.abspath(path),),
+            ).fetchall()
+        return {
+            name: value_text if value_num is None else value_num
+            for name, value_num, value_text in rows
+        }
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_run_store(directory):
+    """The ``RunStore`` of ``directory``, one per directory and process."""
+    directory = Path(directory)
+    with _stores_lock:
+        store = _stores.get(directory)
+        if store is None:
+            store = _stores[directory] = RunStore(directory / STORE_NAME)
+        return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m mlsconverters.store",
+        description="Reindex the MLS documents of a directory.",
+    )
+    parser.add_argument("directory")
+    parser.add_argument(
+        "--full", action="store_true", help="reindex unchanged files too"
+    )
+    parser.add_argument(
+        "--workers", type=int, help="parsing processes, one per CPU by default"
+    )
+    options = parser.parse_args(argv)
+    from .scanner import print_progress, reindex
+
+    store = get_run_store(options.directory)
+    summary = reindex(
+        options.directory,
+        store,
+        full=options.full,
+        workers=options.workers,
+        progress=print_progress,
+    )
+    print(
+        "indexed {} documents in {:.2f}s, {} runs".format(
+            summary.parsed, summary.seconds, len(store)
+        )
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
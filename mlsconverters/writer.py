@@ -0,0 +1,123 @@
+import atexit
+import os
+import queue
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+_STOP = object()
+
+
+def atomic_stream(path, write, binary=False):
+    """Call ``write(f)`` on a temporary file renamed to ``path`` after.
+
+    The file is opened in text mode unless ``binary``.
+    """
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb" if binary else "w") as f:
+            write(f)
+        os.replace(tmp, str(path))
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
+
+
+def atomic_write(path, text):
+    """Write ``text`` or bytes to ``path`` through a temporary file and a rename."""
+    return atomic_stream(path, lambda f: f.write(text), binary=isinstance(text, bytes))
+
+
+class BackgroundWriter:
+    """Write MLS documents from a dedicated thread.
+
+    Documents are taken from a bounded queue, ``submit`` blocks while it is
+    full, and written atomically. ``flush`` waits until everything submitted
+    so far is on disk and re-raises the first failed write, ``close`` also
+    stops the thread and runs at interpreter exit. Documents are written
+    with ``write(path, mls)``, ``atomic_write`` by default.
+    """
+
+    def __init__(self, maxsize=1024, write=atomic_write):
+        self._queue = queue.Queue(maxsize)
+        self._write = write
+        self._lock = threading.Lock()
+        self._error = None
+        self.written = 0
+        self.failed = 0
+        self.total_write_seconds = 0.0
+        self.max_write_seconds = 0.0
+        self._thread = threading.Thread(
+            target=self._run, name="mls-background-writer", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def closed(self):
+        return not self._thread.is_alive()
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        with self._lock:
+            written = self.written
+            return {
+                "queue_depth": self.queue_depth,
+                "written": written,
+                "failed": self.failed,
+                "mean_write_seconds": (
+                    self.total_write_seconds / written if written else 0.0
+                ),
+                "max_write_seconds": self.max_write_seconds,
+            }
+
+    def submit(self, path, mls):
+        if self.closed:
+            raise RuntimeError("background writer is closed")
+        self._queue.put((path, mls))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                start = time.perf_counter()
+                try:
+                    self._write(*item)
+                except Exception as e:  # pylint: disable=W0703
+                    with self._lock:
+                        self.failed += 1
+                        if self._error is None:
+                            self._error = e
+                    continue
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.written += 1
+                    self.total_write_seconds += elapsed
+                    self.max_write_seconds = max(self.max_write_seconds, elapsed)
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self):
+        with self._lock:
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def flush(self):
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        if not self.closed:
+            self._queue.put(_STOP)
+            self._thread.join()
+        atexit.unregister(self.close)
+        self._raise_error()
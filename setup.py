@@ -1,6 +1,11 @@
 from setuptools import find_packages, setup
 
 install_requires = ["calamus>=0.3.8", "gorilla", "numpy"]
+extras_require = {
+    "zstd": ["zstandard"],
+    "msgpack": ["msgpack"],
+    "cbor": ["cbor2"],
+}
 packages = find_packages()
 version_file = open("VERSION")
 
@@ -12,6 +17,7 @@ setup(
     author="Viktor Gal",
     author_email="viktor.gal@maeth.com",
     install_requires=install_requires,
+    extras_require=extras_require,
     packages=packages,
     tests_require=["pytest>=4.0.0"],
     zip_safe=False,
@@ -0,0 +1,107 @@
+import json
+from functools import partial
+
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import (accuracy_score, f1_score, log_loss,
+                             mean_squared_error, roc_auc_score)
+
+import mlsconverters
+from mlsconverters import io
+from mlsconverters.evaluation import evaluate
+
+MLS = "http://www.w3.org/ns/mls#"
+
+
+class CountingModel:
+    def __init__(self, model):
+        self.model = model
+        self.calls = []
+
+    def predict(self, X):
+        self.calls.append(("predict", len(X)))
+        return self.model.predict(X)
+
+    def predict_proba(self, X):
+        self.calls.append(("predict_proba", len(X)))
+        return self.model.predict_proba(X)
+
+
+@pytest.fixture
+def fitted():
+    X, y = make_classification(n_samples=500, random_state=0)
+    return LogisticRegression().fit(X, y), X, y
+
+
+def test_evaluate_predicts_once(fitted):
+    model, X, y = fitted
+    counting = CountingModel(model)
+    results = evaluate(
+        counting,
+        X,
+        y,
+        [accuracy_score, "f1_score", partial(f1_score, average="macro"), roc_auc_score,
+         log_loss, mean_squared_error],
+    )
+    assert counting.calls == [("predict", 500), ("predict_proba", 500)]
+
+    y_pred, y_score = model.predict(X), model.predict_proba(X)[:, 1]
+    expected = [
+        (MLS + "accuracy", accuracy_score(y, y_pred)),
+        (MLS + "F1", f1_score(y, y_pred)),
+        (MLS + "F1", f1_score(y, y_pred, average="macro")),
+        (MLS + "auROC", roc_auc_score(y, y_score)),
+        (MLS + "log_loss", log_loss(y, y_score)),
+        (MLS + "mean_squared_error", mean_squared_error(y, y_pred)),
+    ]
+    assert [m for m, _ in results] == [m for m, _ in expected]
+    np.testing.assert_allclose([v for _, v in results], [v for _, v in expected])
+
+
+def test_evaluate_chunked(fitted):
+    model, X, y = fitted
+    counting = CountingModel(model)
+    metrics = ["accuracy_score", "roc_auc_score"]
+    assert evaluate(counting, X, y, metrics, chunksize=128) == evaluate(model, X, y, metrics)
+    assert counting.calls[:4] == [("predict", 128)] * 3 + [("predict", 116)]
+
+
+def test_evaluate_chunked_sparse(fitted):
+    import scipy.sparse
+
+    model, X, y = fitted
+    metrics = ["accuracy_score", "roc_auc_score"]
+    sparse = scipy.sparse.csr_matrix(X)
+    assert evaluate(model, sparse, y, metrics, chunksize=128) == evaluate(model, X, y, metrics)
+
+
+def test_export_with_evaluation(fitted, tmp_path):
+    model, X, y = fitted
+    io.set_mls_dir(tmp_path)
+    try:
+        path = mlsconverters.export(
+            model, evaluation=(X, y), metrics=["accuracy_score", "roc_auc_score"]
+        )
+    finally:
+        io.set_mls_dir(None)
+    outputs = json.loads(path.read_text())[MLS + "hasOutput"]
+    assert [o[MLS + "specifiedBy"]["@id"] for o in outputs] == [
+        MLS + "accuracy", MLS + "auROC"
+    ]
+    with pytest.raises(ValueError):
+        mlsconverters.export(model, force=True, evaluation=(X, y))
+
+
+def test_evaluate_column_vector_targets(fitted):
+    from sklearn.linear_model import LinearRegression
+
+    model, X, y = fitted
+    results = dict(evaluate(model, X, y.reshape(-1, 1), ["accuracy_score"]))
+    assert results[MLS + "accuracy"] == pytest.approx(accuracy_score(y, model.predict(X)))
+
+    regression = LinearRegression().fit(X, X @ np.arange(X.shape[1]))
+    target = (X @ np.arange(X.shape[1])).reshape(-1, 1)
+    (_, mse), = evaluate(regression, X, target, ["mean_squared_error"])
+    assert mse == pytest.approx(0, abs=1e-12)
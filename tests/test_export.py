@@ -0,0 +1,177 @@
+import json
+
+import pytest
+
+from sklearn.linear_model import LogisticRegression, Ridge
+from sklearn.metrics import accuracy_score
+from sklearn.svm import SVC
+
+from mlsconverters import export_many, export_many_to_dir
+
+
+def _models():
+    return [LogisticRegression(C=c) for c in (0.1, 1.0, 10.0)] + [Ridge(), SVC()]
+
+
+def test_export_many_to_dir(tmp_path):
+    models = _models()
+    summary = export_many_to_dir(models, tmp_path)
+    assert summary.count == len(models)
+    assert summary.models_per_second > 0
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        "{}.jsonld".format(m.__hash__()) for m in models
+    )
+    for path in summary.paths:
+        assert json.loads(path.read_text())["@type"] == ["http://www.w3.org/ns/mls#Run"]
+
+
+def test_export_many_to_dir_graph(tmp_path):
+    models = _models()
+    items = [(m, {"evaluation_measure": (accuracy_score, 0.5)}) for m in models]
+    summary = export_many_to_dir(items, tmp_path, graph=True, graph_name="sweep")
+    assert [p.name for p in summary.paths] == ["sweep.jsonld"]
+    document = json.loads((tmp_path / "sweep.jsonld").read_text())
+    assert len(document["@graph"]) == len(models)
+    assert all(len(run["http://www.w3.org/ns/mls#hasOutput"]) == 1 for run in document["@graph"])
+
+
+def test_export_many_outside_renku_is_noop():
+    summary = export_many(_models())
+    assert summary.count == 0 and summary.paths == []
+
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+def test_export_many_to_dir_parallel(tmp_path, executor):
+    def load(summary):
+        docs = [json.loads(p.read_text()) for p in summary.paths]
+        for doc in docs:
+            del doc["http://www.w3.org/ns/mls#executes"]["@id"]
+        return docs
+
+    models = _models()
+    serial = export_many_to_dir(models, tmp_path / "serial")
+    parallel = export_many_to_dir(
+        models, tmp_path / "parallel", workers=2, executor=executor, chunksize=2
+    )
+    assert [p.name for p in parallel.paths] == [p.name for p in serial.paths]
+    assert load(parallel) == load(serial)
+
+
+def test_export_many_unknown_executor(tmp_path):
+    with pytest.raises(ValueError):
+        export_many_to_dir(_models(), tmp_path, workers=2, executor="gpu")
+
+
+def test_export_many_to_dir_sidecar_arrays(tmp_path):
+    import numpy as np
+    from sklearn.linear_model import RidgeCV
+    from mlsconverters.arrays import resolve_arrays
+
+    alphas = np.logspace(-3, 3, 500)
+    models = [RidgeCV(alphas=alphas, fit_intercept=f) for f in (True, False)]
+    summary = export_many_to_dir(models, tmp_path, sidecar_threshold=100)
+    assert len(list(tmp_path.glob("*.npy"))) == 1
+    for path in summary.paths:
+        doc = resolve_arrays(json.loads(path.read_text()), base_dir=path.parent)
+        values = [v["http://www.w3.org/ns/mls#hasValue"]["@value"]
+                  for v in doc["http://www.w3.org/ns/mls#hasInput"]
+                  if v["@id"].startswith("http://www.w3.org/ns/mls#HyperParameterSetting.alphas.")]
+        assert isinstance(values[0], np.memmap)
+        np.testing.assert_array_equal(values[0], alphas)
+
+
+@pytest.fixture
+def mls_dir(tmp_path):
+    from mlsconverters import io
+
+    io.set_mls_dir(tmp_path)
+    yield tmp_path
+    io.set_mls_dir(None)
+
+
+def test_export_cache(mls_dir, monkeypatch):
+    import mlsconverters
+    from mlsconverters import cache
+
+    calls = []
+    extract_run = mlsconverters._extract_run
+
+    def counting_extract_run(model, **kwargs):
+        calls.append(model)
+        return extract_run(model, **kwargs)
+
+    monkeypatch.setattr(mlsconverters, "_extract_run", counting_extract_run)
+    monkeypatch.setattr(cache, "_caches", {})
+    measure = (accuracy_score, 0.5)
+
+    path = mlsconverters.export(SVC(C=2), cache=True, evaluation_measure=measure)
+    assert path.exists()
+    # same content, other object and a fresh process-level cache
+    assert mlsconverters.export(SVC(C=2), cache=True, evaluation_measure=measure) == path
+    monkeypatch.setattr(cache, "_caches", {})
+    assert mlsconverters.export(SVC(C=2), cache=True, evaluation_measure=measure) == path
+    assert len(calls) == 1
+    assert cache.get_export_cache(mls_dir).stats()["disk_hits"] == 1
+
+    assert mlsconverters.export(SVC(C=2), cache=True) != path
+    assert mlsconverters.export(SVC(C=3), cache=True, evaluation_measure=measure) != path
+    path.unlink()
+    assert mlsconverters.export(SVC(C=2), cache=True, evaluation_measure=measure).exists()
+    assert len(calls) == 4
+    assert cache.get_export_cache(mls_dir).stats()["misses"] == 3
+
+
+def test_export_cache_array_policy(mls_dir, monkeypatch):
+    import numpy as np
+
+    import mlsconverters
+    from mlsconverters import cache
+    from mlsconverters.arrays import ArrayPolicy
+    from sklearn.linear_model import RidgeCV
+
+    monkeypatch.setattr(cache, "_caches", {})
+    alphas = np.linspace(0.1, 10, 5000)
+    full = mlsconverters.export(RidgeCV(alphas=alphas), cache=True)
+    summary = mlsconverters.export(
+        RidgeCV(alphas=alphas), cache=True, array_policy=ArrayPolicy("summary", 10)
+    )
+    assert summary != full
+    assert summary.stat().st_size < full.stat().st_size / 10
+
+
+def test_export_cache_mutated_model(mls_dir, monkeypatch):
+    import gc
+    import weakref
+
+    import mlsconverters
+    from mlsconverters import cache, loader
+
+    monkeypatch.setattr(cache, "_caches", {})
+    model = SVC()
+    default = mlsconverters.export(model, cache=True)
+    model.C = 5.0
+    mutated = mlsconverters.export(model, cache=True)
+    assert mutated != default
+    assert mlsconverters.export(SVC(), cache=True) == default
+    assert loader.extract(default, ["C"])[0] == {"C": 1.0}
+    assert loader.extract(mutated, ["C"])[0] == {"C": 5.0}
+
+    models = [SVC(C=i + 1) for i in range(5)]
+    for m in models:
+        mlsconverters.export(m, cache=True)
+    refs = [weakref.ref(m) for m in models]
+    del models, m, model
+    gc.collect()
+    assert all(ref() is None for ref in refs)
+
+
+def test_export_streams_document(mls_dir, monkeypatch):
+    import mlsconverters
+    from mlsconverters import serializer
+
+    def no_dumps(*args, **kwargs):
+        raise AssertionError("document built as a string")
+
+    monkeypatch.setattr(serializer, "dumps", no_dumps)
+    path = mlsconverters.export(SVC(C=2), evaluation_measure=(accuracy_score, 0.5))
+    assert json.loads(path.read_text())["@id"]
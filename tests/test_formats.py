@@ -0,0 +1,84 @@
+import json
+
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from mlsconverters import export, export_to_file, formats, io, serializer
+from mlsconverters.sklearn import to_run
+
+# formats backed by optional dependencies, see the extras in setup.py
+OPTIONAL_MODULES = {
+    formats.FORMAT_ZSTD: "zstandard",
+    formats.FORMAT_MSGPACK: "msgpack",
+    formats.FORMAT_CBOR: "cbor2",
+}
+
+
+def requires(fmt):
+    if fmt in OPTIONAL_MODULES:
+        pytest.importorskip(OPTIONAL_MODULES[fmt])
+
+
+@pytest.fixture
+def run():
+    model = LogisticRegression(random_state=0).fit([[0, 1], [1, 0], [1, 1]], [0, 1, 1])
+    return to_run(model)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("fmt", formats.FORMATS)
+def test_round_trip(run, fmt, compact):
+    requires(fmt)
+    expected = json.loads(serializer.dumps(run))
+    data = formats.dumps(run, fmt, compact_iris=compact)
+    assert formats.loads(data, fmt) == expected
+    document = formats.dumps(serializer.dumps(run), fmt, compact)
+    assert formats.loads(document, fmt) == expected
+
+
+def test_compact_document(run):
+    plain = serializer.dumps(run)
+    compacted = formats.compact(json.loads(plain))
+    assert compacted["@context"]["mls"] == "http://www.w3.org/ns/mls#"
+    assert "mls:executes" in compacted
+    del compacted["@context"]
+    assert "http://www.w3.org/ns/mls#" not in json.dumps(compacted)
+    assert len(json.dumps(compacted)) < len(plain) * 0.7
+    compacted["@context"] = formats.CONTEXT
+    assert formats.expand(compacted) == json.loads(plain)
+
+
+def test_format_of():
+    assert formats.format_of("a/b.jsonld") == formats.FORMAT_JSONLD
+    assert formats.format_of("b.jsonld.gz") == formats.FORMAT_GZIP
+    assert formats.format_of("b.jsonld.zst") == formats.FORMAT_ZSTD
+    assert formats.format_of("b.msgpack") == formats.FORMAT_MSGPACK
+    with pytest.raises(ValueError):
+        formats.suffix("xml")
+
+
+def test_export_to_file(tmp_path):
+    requires(formats.FORMAT_ZSTD)
+    model = LogisticRegression(random_state=0)
+    export_to_file(model, str(tmp_path / "plain.jsonld"))
+    export_to_file(model, str(tmp_path / "model.jsonld.zst"), compact=True)
+    document = formats.load(tmp_path / "model.jsonld.zst")
+    plain = json.loads((tmp_path / "plain.jsonld").read_text())
+    assert document.keys() == plain.keys()
+    inputs = "http://www.w3.org/ns/mls#hasInput"
+    assert len(document[inputs]) == len(plain[inputs])
+
+
+@pytest.mark.parametrize("fmt", [formats.FORMAT_GZIP, formats.FORMAT_MSGPACK])
+def test_logged_format(tmp_path, fmt):
+    requires(fmt)
+    io.set_mls_dir(tmp_path)
+    io.set_mls_format(fmt, compact=True)
+    try:
+        path = export(LogisticRegression(random_state=0), force=True)
+        assert path.name.endswith(formats.suffix(fmt))
+        document = formats.load(path)
+        assert "http://www.w3.org/ns/mls#executes" in document
+    finally:
+        io.set_mls_format()
+        io.set_mls_dir(None)
@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("calamus", "marshmallow", "psutil", "renku", "sklearn", "xgboost", "keras")
+
+
+def _import_times(module):
+    """``{module: cumulative microseconds}`` from ``python -X importtime``."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + module],
+        env=env,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module", ["mlsconverters", "mlsconverters.session"])
+def test_import_is_lazy(module):
+    times = _import_times(module)
+    loaded = {name.split(".")[0] for name in times}
+    assert not loaded.intersection(HEAVY)
+
+
+def test_import_time_budget():
+    # it took ~0.45s when renku and calamus were imported eagerly
+    assert _import_times("mlsconverters")["mlsconverters"] < 200000
@@ -0,0 +1,128 @@
+import os
+import types
+
+import pytest
+
+from mlsconverters import io
+
+
+class _Context:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def __call__(self, path):
+        self.calls.append(os.getcwd())
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+@pytest.fixture
+def renku(monkeypatch, tmp_path):
+    calls = []
+    monkeypatch.setattr(io, "renku_project_context", _Context(calls))
+    monkeypatch.setattr(io, "project_context",
+                        types.SimpleNamespace(metadata_path=str(tmp_path / ".renku")))
+    io.clear_cache()
+    yield calls
+    io.clear_cache()
+    io.set_mls_dir(None)
+
+
+def test_renku_detection_is_cached(monkeypatch, renku):
+    calls = []
+    parent = io.psutil.Process.parent
+
+    def counting_parent(self):
+        calls.append(self)
+        return parent(self)
+
+    monkeypatch.setattr(io.psutil.Process, "parent", counting_parent)
+    assert io.renku_mls_path() is None
+    walked = len(calls)
+    assert walked > 0
+    for _ in range(3):
+        assert io.renku_mls_path() is None
+    assert len(calls) == walked
+
+
+def test_project_lookup_cached_per_cwd(monkeypatch, renku, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    path = io.renku_mls_path(force=True)
+    assert io.renku_mls_path(force=True) == path
+    assert len(renku) == 1
+    monkeypatch.setenv(io.ENV_RENKU_HOME, ".other")
+    io.renku_mls_path(force=True)
+    (tmp_path / "sub").mkdir()
+    monkeypatch.chdir(tmp_path / "sub")
+    io.renku_mls_path(force=True)
+    assert len(renku) == 3
+
+
+def test_set_mls_dir(renku, tmp_path):
+    io.set_mls_dir(tmp_path / "out")
+    io.log_renku_mls("{}", "run")
+    assert (tmp_path / "out" / "run.jsonld").read_text() == "{}"
+    assert renku == []
+
+
+def test_removed_mls_dir_is_recreated(renku, tmp_path):
+    import shutil
+    from mlsconverters.models import Run
+
+    io.set_mls_dir(tmp_path / "out")
+    io.log_renku_mls("{}", "a")
+    shutil.rmtree(str(tmp_path / "out"))
+    io.log_renku_mls("{}", "b")
+    shutil.rmtree(str(tmp_path / "out"))
+    io.log_renku_run(Run("c"), "c")
+    shutil.rmtree(str(tmp_path / "out"))
+    io.open_renku_run_log("d").close()
+    assert sorted(os.listdir(str(tmp_path / "out"))) == ["d.events.jsonl"]
+
+    io.set_mls_dir(tmp_path / "other")
+    assert io._existing_dirs == set()
+
+
+def test_background_writer_recreates_mls_dir(renku, tmp_path):
+    import shutil
+
+    io.set_mls_dir(tmp_path / "out")
+    writer = io.enable_background_writer()
+    try:
+        io.log_renku_mls("{}", "a")
+        writer.flush()
+        shutil.rmtree(str(tmp_path / "out"))
+        io.log_renku_mls("{}", "b")
+        writer.flush()
+    finally:
+        io.disable_background_writer()
+    assert os.listdir(str(tmp_path / "out")) == ["b.jsonld"]
+
+
+def test_background_writer(renku, tmp_path):
+    io.set_mls_dir(tmp_path)
+    writer = io.enable_background_writer(maxsize=4)
+    try:
+        for i in range(20):
+            io.log_renku_mls('{"n": %d}' % i, "run-%d" % i)
+        writer.flush()
+        assert writer.stats()["written"] == 20
+        assert writer.queue_depth == 0
+        assert (tmp_path / "run-19.jsonld").read_text() == '{"n": 19}'
+        assert not list(tmp_path.glob("*.tmp"))
+
+        # missing directories are created, a file in the way is an error
+        io.write_mls(tmp_path / "run-0.jsonld", "{}", "run")
+        with pytest.raises(NotADirectoryError):
+            writer.flush()
+        assert writer.stats()["failed"] == 1
+    finally:
+        io.disable_background_writer()
+    assert writer.closed
+    io.log_renku_mls("{}", "inline")
+    assert (tmp_path / "inline.jsonld").exists()
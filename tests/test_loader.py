@@ -0,0 +1,86 @@
+import json
+
+import pytest
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import GridSearchCV
+from sklearn.svm import SVC
+
+from mlsconverters import formats, loader, serializer
+from mlsconverters.models import ModelEvaluationSchema
+from mlsconverters.runlog import events_to_run, metric_event
+from mlsconverters.sklearn import to_run
+
+
+@pytest.fixture
+def run():
+    model = GridSearchCV(SVC(), {"kernel": ("linear", "rbf"), "C": [1, 10]})
+    model.fit([[0, 1], [1, 0], [1, 1], [0, 0]] * 3, [0, 1, 1, 0] * 3)
+    return to_run(model, evaluation_measure=(accuracy_score, 0.5))
+
+
+@pytest.fixture
+def series_run():
+    events = [
+        {"event": "run", "id": "r1", "algorithm": "http://www.w3.org/ns/mls#SVC"},
+        {"event": "implementation", "id": "impl", "algorithm": None,
+         "version": "1.0", "name": None},
+        {"event": "param", "name": "lr.max", "value": 0.1},
+        {"event": "param", "name": "layers", "value": [8, 4]},
+    ]
+    events += [metric_event("loss", 1.0 / (step + 1), step) for step in range(3)]
+    events.append(metric_event("accuracy", 0.9))
+    return events_to_run(events)
+
+
+def test_round_trip(run, series_run):
+    for r in (run, series_run):
+        text = serializer.dumps(r)
+        document = loader.loads(text)
+        assert serializer.dumps(document.to_run()) == text
+
+
+def test_views(series_run):
+    document = loader.loads(serializer.dumps(series_run))
+    assert document._id == "r1"
+    assert document.algorithm == "http://www.w3.org/ns/mls#SVC"
+    assert document.hyperparameters() == {"lr.max": 0.1, "layers": [8, 4]}
+    assert document.hyperparameters(["layers", "missing"]) == {"layers": [8, 4]}
+    assert document.metric_series(["loss"]) == {
+        "loss": [(0, 1.0), (1, 0.5), (2, 1.0 / 3)]
+    }
+    assert document.metrics() == {"loss": 1.0 / 3, "accuracy": 0.9}
+    assert document.metrics([]) == {}
+
+
+def test_lazy_materialization(run):
+    document = loader.loads(serializer.dumps(run))
+    assert document._input_values is None and document._output_values is None
+    document.metrics()
+    assert document._output_values is None
+    inputs = document.input_values
+    assert inputs is document.input_values
+    assert {s.specified_by.label: s.value for s in inputs} == document.hyperparameters()
+    assert document._output_values is None
+
+
+def test_extract(tmp_path, run):
+    pytest.importorskip("zstandard")
+    path = tmp_path / "run.jsonld.zst"
+    path.write_bytes(formats.dumps(run, formats.FORMAT_ZSTD, compact_iris=True))
+    hyperparameters, metrics = loader.extract(path, ["estimator__C"], ["accuracy"])
+    assert hyperparameters == {"estimator__C": 1.0}
+    assert metrics == {"accuracy": 0.5}
+
+
+def test_schema_load_typed_value():
+    dumped = {
+        "@id": "http://www.w3.org/ns/mls#ModelEvaluation.1",
+        "@type": ["http://www.w3.org/ns/mls#ModelEvaluation"],
+        "http://www.w3.org/ns/mls#hasValue": {"@type": "xsd:float", "@value": 0.5},
+        "http://www.w3.org/ns/mls#specifiedBy": {
+            "@id": "http://www.w3.org/ns/mls#accuracy",
+            "@type": ["http://www.w3.org/ns/mls#EvaluationMeasure"],
+        },
+    }
+    evaluation = ModelEvaluationSchema().load(json.loads(json.dumps(dumped)))
+    assert evaluation.value == 0.5
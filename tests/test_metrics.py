@@ -0,0 +1,41 @@
+import json
+
+from mlsconverters import serializer
+from mlsconverters.metrics import FlushPolicy, MetricLog, MetricSeries
+from mlsconverters.models import Run
+
+
+def test_metric_series_grows():
+    series = MetricSeries("loss", capacity=1)
+    for step in range(100):
+        series.append(1.0 / (step + 1), step, 0.0)
+    assert len(series) == 100
+    assert series.steps.tolist() == list(range(100))
+    assert series.values[-1] == 0.01
+
+
+def test_metric_log_pending_events_and_evaluations():
+    log = MetricLog()
+    log.log({"loss": 0.5, "accuracy": 0.7}, step=0)
+    log.log({"loss": float("nan"), "accuracy": 0.8}, step=1)
+    events = log.pending_events()
+    assert len(events) == 4
+    assert events[1] == {
+        "event": "metric", "name": "loss", "value": "nan", "step": 1, "time": events[1]["time"]
+    }
+    assert log.pending_events() == []
+    log.log({"loss": 0.1}, step=2)
+    assert [event["step"] for event in log.pending_events()] == [2]
+
+    run = Run(7, input_values=[], output_values=log.evaluations(7))
+    outputs = json.loads(serializer.dumps(run))["http://www.w3.org/ns/mls#hasOutput"]
+    assert len(outputs) == 5
+    assert outputs[2]["http://www.w3.org/ns/mls#step"] == 2
+    assert outputs[2]["@id"] == "http://www.w3.org/ns/mls#ModelEvaluation.loss.2.7"
+
+
+def test_flush_policy():
+    policy = FlushPolicy(every_steps=3)
+    assert [policy.step() for _ in range(7)] == [False, False, True, False, False, True, False]
+    assert FlushPolicy(every_seconds=0).step()
+    assert not FlushPolicy().step()
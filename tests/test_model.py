@@ -23,6 +23,8 @@ from sklearn.ensemble import RandomForestClassifier, AdaBoostClassifier
 from sklearn.naive_bayes import GaussianNB
 from sklearn.discriminant_analysis import QuadraticDiscriminantAnalysis
 from scipy.stats import uniform
+from sklearn.metrics import accuracy_score
+from sklearn.preprocessing import StandardScaler
 
 @pytest.mark.parametrize("sklearn_model", [
     LogisticRegression(random_state=0),
@@ -81,3 +83,152 @@ def test_to_mls(sklearn_model):
         with open('asdf', 'w') as f:
             f.write(to_mls(sklearn_model))
     json.loads(s)
+
+
+def test_to_mls_memo_shares_subtrees():
+    from mlsconverters.common import ParamsMemo
+    from mlsconverters.sklearn import to_run
+    from mlsconverters import serializer
+
+    base = SVC(kernel='linear')
+    searches = [GridSearchCV(base, {'C': [c, 10]}) for c in range(5)]
+    memo = ParamsMemo(maxsize=16)
+    for search in searches:
+        run = to_run(search, model_hash=0, memo=memo)
+        expected = to_run(search, model_hash=0)
+        strip = lambda s: json.loads(s)["http://www.w3.org/ns/mls#hasInput"]
+        assert strip(serializer.dumps(run)) == strip(serializer.dumps(expected))
+    assert memo.hits >= len(searches) - 1
+    assert len(memo) <= 16
+
+
+def test_to_mls_drop_nested_keys():
+    model = Pipeline([('anova', SelectKBest(f_regression, k=1)), ('svc', SVC(kernel='linear'))])
+    labels = {v["http://www.w3.org/2000/01/rdf-schema#label"] for v in json.loads(
+        to_mls(model, drop_nested_keys=True)
+    )["http://www.w3.org/ns/mls#executes"]["http://www.w3.org/ns/mls#hasHyperParameter"]}
+    assert labels and not any("__" in label for label in labels)
+    assert "steps" in labels
+
+
+def test_to_mls_normalizes_param_types():
+    import enum
+    import pathlib
+    import numpy as np
+    from mlsconverters.common import deep_get_params
+
+    class Color(enum.Enum):
+        RED = 1
+
+    params = deep_get_params({
+        "a": np.float32(0.5), "b": np.int64(3), "c": np.array([1.0, np.nan]),
+        "d": pathlib.Path("x/y"), "e": Color.RED, "f": (np.inf, "s"),
+        "g": uniform(loc=0, scale=4),
+    }, None)
+    assert params == {
+        "a": 0.5, "b": 3, "c": [1.0, "nan"], "d": "x/y", "e": 1, "f": ["inf", "s"],
+        "g": {"dist_name": "uniform", "args": [], "kwds": {"loc": 0, "scale": 4}},
+    }
+    json.dumps(params, allow_nan=False)
+
+
+def test_to_mls_unsupported_param_type():
+    model = SVC(C=1)
+    model.C = {1, 2}
+    with pytest.raises(NotImplementedError):
+        to_mls(model)
+
+
+def test_array_policy(tmp_path):
+    import numpy as np
+    from mlsconverters.arrays import ArrayPolicy, array_to_list
+
+    values = np.array([[1.0, np.nan], [np.inf, -np.inf]])
+    assert array_to_list(values) == [[1.0, "nan"], ["inf", "-inf"]]
+
+    model = RidgeCV(alphas=np.linspace(0.1, 10, 50))
+    alphas = "http://www.w3.org/ns/mls#HyperParameterSetting.alphas."
+
+    def alphas_value(**kwargs):
+        doc = json.loads(to_mls(model, **kwargs))
+        setting, = [v for v in doc["http://www.w3.org/ns/mls#hasInput"] if v["@id"].startswith(alphas)]
+        return setting["http://www.w3.org/ns/mls#hasValue"]["@value"]
+
+    assert len(alphas_value()) == 50
+    assert len(alphas_value(array_policy=ArrayPolicy("summary", threshold=100))) == 50
+    summary = alphas_value(array_policy=ArrayPolicy("summary", threshold=10))
+    assert summary["shape"] == [50] and summary["min"] == 0.1 and summary["max"] == 10.0
+
+    policy = ArrayPolicy("sidecar", threshold=10, sidecar_dir=tmp_path)
+    reference = alphas_value(array_policy=policy)
+    assert alphas_value(array_policy=policy) == reference
+    assert [p.name for p in tmp_path.iterdir()] == [reference["sha256"] + ".npy"]
+    np.testing.assert_array_equal(np.load(tmp_path / (reference["sha256"] + ".npy")), model.alphas)
+
+
+def test_array_policy_non_numeric(tmp_path):
+    import numpy as np
+    from mlsconverters.arrays import ArrayPolicy
+    from mlsconverters.common import deep_get_params
+
+    policy = ArrayPolicy("sidecar", threshold=1, sidecar_dir=tmp_path)
+    labels = np.array(["a", None, 3.5], dtype=object)
+    assert deep_get_params({"x": labels}, None, array_policy=policy) == {"x": ["a", None, 3.5]}
+    assert deep_get_params({"x": np.array(["a", "b"])}, None, array_policy=policy) == {"x": ["a", "b"]}
+    assert list(tmp_path.iterdir()) == []
+
+    for value in (np.array([1j, 2]), np.array(["2020-01-01"], dtype="datetime64[D]")):
+        with pytest.raises(NotImplementedError):
+            deep_get_params({"x": value}, None)
+
+
+@pytest.fixture
+def id_strategy():
+    from mlsconverters import common
+
+    previous = common.get_id_strategy()
+    yield common.set_id_strategy
+    common._id_strategy = previous
+
+
+def test_counter_ids_are_unique(id_strategy):
+    from mlsconverters.common import generate_unique_id
+
+    id_strategy("counter")
+    ids = {generate_unique_id("x") for _ in range(10000)}
+    assert len(ids) == 10000
+
+
+def test_content_ids_are_deterministic(id_strategy):
+    id_strategy("content")
+    model = Pipeline([("scale", StandardScaler()), ("svc", SVC(C=2))])
+    mls = to_mls(model, evaluation_measure=(accuracy_score, 0.5))
+    same = Pipeline([("scale", StandardScaler()), ("svc", SVC(C=2))])
+    assert to_mls(same, evaluation_measure=(accuracy_score, 0.5)) == mls
+    other = Pipeline([("scale", StandardScaler()), ("svc", SVC(C=3))])
+    assert json.loads(to_mls(other))["@id"] != json.loads(mls)["@id"]
+
+
+def test_content_ids_of_equal_evaluations(id_strategy):
+    id_strategy("content")
+    accuracy = "http://www.w3.org/ns/mls#accuracy"
+    mls = json.loads(to_mls(
+        SVC(C=2), evaluation_measure=(accuracy_score, 0.5),
+        evaluations=[(accuracy, 0.5), (accuracy, 0.5)],
+    ))
+    ids = [v["@id"] for v in mls["http://www.w3.org/ns/mls#hasOutput"]]
+    assert len(set(ids)) == 3
+
+
+def test_uuid_ids(id_strategy):
+    from mlsconverters.common import new_id
+
+    id_strategy("uuid")
+    assert len(new_id()) == 36
+
+
+def test_unknown_id_strategy():
+    from mlsconverters.common import set_id_strategy
+
+    with pytest.raises(ValueError):
+        set_id_strategy("nope")
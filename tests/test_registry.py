@@ -0,0 +1,92 @@
+import types
+
+import pytest
+from sklearn.linear_model import LogisticRegression
+from xgboost import XGBClassifier
+
+from mlsconverters import registry
+from mlsconverters.common import (EVALUATION_MEASURES, evaluation_measure,
+                                  register_evaluation_measure)
+
+
+class Model:
+    pass
+
+
+class SubModel(Model):
+    pass
+
+
+def _converter(name):
+    return types.SimpleNamespace(
+        name=name, to_mls=lambda model, **kwargs: name, to_run=None
+    )
+
+
+def test_builtin_converters():
+    from mlsconverters import sklearn, xgboost
+
+    assert registry.get_converter(LogisticRegression()) is sklearn
+    # XGBModel comes before BaseEstimator in the MRO
+    assert registry.get_converter(XGBClassifier()) is xgboost
+
+
+def test_mro_lookup_is_cached():
+    converters = registry.ConverterRegistry()
+    converters._entry_points_loaded = True
+    converters.register(Model, _converter("model"))
+    assert converters.get(SubModel).name == "model"
+    assert SubModel in converters._cache
+
+    converters.register("{}.SubModel".format(__name__), _converter("sub"))
+    assert converters.get(SubModel).name == "sub"
+    assert converters.get(Model).name == "model"
+
+    with pytest.raises(ValueError):
+        converters.get(int)
+
+
+def test_entry_point_plugins(monkeypatch):
+    class EntryPoint:
+        name = "{}.Model".format(__name__)
+
+        def load(self):
+            loaded.append(self.name)
+            return _converter("plugin")
+
+    loaded = []
+    monkeypatch.setattr(registry, "_entry_points", lambda: [EntryPoint()])
+    converters = registry.ConverterRegistry()
+    assert loaded == []
+    assert converters.get(SubModel).name == "plugin"
+    assert converters.get(Model).name == "plugin"
+    assert loaded == [EntryPoint.name]
+
+
+def test_entry_point_of_builtin_subclass(monkeypatch):
+    class LogisticRegressionPlugin:
+        name = "sklearn.linear_model._logistic.LogisticRegression"
+
+        def load(self):
+            return _converter("plugin")
+
+    monkeypatch.setattr(registry, "_entry_points", lambda: [LogisticRegressionPlugin()])
+    converters = registry.ConverterRegistry()
+    converters.register("sklearn.base.BaseEstimator", _converter("sklearn"))
+    assert converters.get(LogisticRegression).name == "plugin"
+
+
+def log_loss(y_true, y_pred):
+    pass
+
+
+def test_register_evaluation_measure(monkeypatch):
+    with pytest.raises(ValueError):
+        evaluation_measure(log_loss, 0.1)
+    monkeypatch.setattr(
+        "mlsconverters.common.EVALUATION_MEASURES", dict(EVALUATION_MEASURES)
+    )
+    register_evaluation_measure("log_loss", "http://www.w3.org/ns/mls#logLoss")
+    evaluation = evaluation_measure(log_loss, 0.1)
+    assert evaluation.specified_by._id == "http://www.w3.org/ns/mls#logLoss"
+    assert evaluation.value == 0.1
@@ -0,0 +1,104 @@
+import json
+
+from mlsconverters import serializer
+from mlsconverters.models import (Algorithm, EvaluationMeasure, HyperParameter,
+                                  HyperParameterSetting, Implementation,
+                                  ModelEvaluation, Run)
+from mlsconverters.runlog import RunLog, compact, events_to_run, read_events
+
+
+def _write_log(path):
+    with RunLog(path) as log:
+        log.run(42, algorithm="http://www.w3.org/ns/mls#SVC")
+        log.implementation(
+            "sklearn.svm.SVC", algorithm="http://www.w3.org/ns/mls#SVC", version="1.0"
+        )
+        log.params({"C": 1.0, "kernel": "rbf"})
+        log.metric("accuracy", 0.5, step=0)
+        log.params({"C": 2.0})
+        log.metric("accuracy", 0.75, step=1)
+
+
+def _expected_run():
+    algo = Algorithm(_id="http://www.w3.org/ns/mls#SVC")
+    hps = [HyperParameter("C", model_hash=42), HyperParameter("kernel", model_hash=42)]
+    measure = EvaluationMeasure(_id="http://www.w3.org/ns/mls#accuracy")
+    return Run(
+        42,
+        executes=Implementation("sklearn.svm.SVC", hps, implements=algo, version="1.0"),
+        input_values=[
+            HyperParameterSetting(value=2.0, specified_by=hps[0], model_hash=42),
+            HyperParameterSetting(value="rbf", specified_by=hps[1], model_hash=42),
+        ],
+        output_values=[
+            ModelEvaluation(
+                "http://www.w3.org/ns/mls#ModelEvaluation.accuracy.{}.42".format(step),
+                value,
+                measure,
+                step=step,
+            )
+            for step, value in enumerate((0.5, 0.75))
+        ],
+        realizes=algo,
+    )
+
+
+def test_run_log_appends_lines(tmp_path):
+    path = tmp_path / "42.events.jsonl"
+    _write_log(path)
+    events = list(read_events(path))
+    assert len(events) == 7
+    assert [e["event"] for e in events[:3]] == ["run", "implementation", "param"]
+    assert events[-1] == {
+        "event": "metric", "name": "accuracy", "value": 0.75, "step": 1, "time": None
+    }
+
+
+def test_read_events_skips_torn_line(tmp_path):
+    path = tmp_path / "42.events.jsonl"
+    _write_log(path)
+    with path.open("a") as f:
+        f.write('{"event": "metric", "na')
+    assert len(list(read_events(path))) == 7
+
+
+def test_reopen_drops_torn_line(tmp_path):
+    path = tmp_path / "42.events.jsonl"
+    _write_log(path)
+    with path.open("a") as f:
+        f.write('{"event": "metric", "na')
+    with RunLog(path) as log:
+        log.metric("accuracy", 0.5, step=2)
+    events = list(read_events(path))
+    assert len(events) == 8 and events[-1]["step"] == 2
+
+    path.write_text('{"event": "me\n{"event": "metric", "name": "loss", "value": 1.0}\n')
+    assert [e["name"] for e in read_events(path)] == ["loss"]
+
+
+def test_compact_matches_run_schema(tmp_path):
+    path = tmp_path / "42.events.jsonl"
+    _write_log(path)
+    out = compact(path)
+    assert out == tmp_path / "42.jsonld"
+    assert json.loads(out.read_text()) == json.loads(serializer.dumps(_expected_run()))
+    assert serializer.dumps(events_to_run(read_events(path))) == out.read_text()
+
+
+def test_evaluation_ids_match_metric_log(tmp_path):
+    from mlsconverters.metrics import MetricLog
+
+    metrics = MetricLog()
+    path = tmp_path / "42.events.jsonl"
+    with RunLog(path) as log:
+        log.run(42)
+        for step, value in ((0, 0.5), (0, 0.6), (1, 0.75)):
+            metrics.log({"accuracy": value}, step=step)
+            log.metric("accuracy", value, step=step)
+    compacted = [o._id for o in events_to_run(read_events(path)).output_values]
+    assert len(set(compacted)) == 3
+    assert compacted == [e._id for e in metrics.evaluations(42)]
+
+    log = RunLog(path)
+    log.discard()
+    assert not path.exists()
@@ -0,0 +1,95 @@
+import os
+
+import numpy as np
+import pytest
+
+from mlsconverters import formats, scanner, store
+from mlsconverters.runlog import events_to_run, metric_event
+
+
+def _write(directory, index, params, accuracy, fmt=formats.FORMAT_JSONLD):
+    events = [
+        {"event": "run", "id": "run{}".format(index), "algorithm": "SGD"},
+        {"event": "implementation", "id": "impl", "algorithm": None,
+         "version": "1.0", "name": None},
+    ]
+    events += [{"event": "param", "name": k, "value": v} for k, v in params.items()]
+    events.append(metric_event("accuracy", accuracy))
+    path = directory / "{}{}".format(index, formats.suffix(fmt))
+    path.write_bytes(formats.dumps(events_to_run(events), fmt))
+    return path
+
+
+@pytest.fixture
+def directory(tmp_path, monkeypatch):
+    pytest.importorskip("zstandard")
+    pytest.importorskip("msgpack")
+    monkeypatch.setattr(store, "_stores", {})
+    _write(tmp_path, 0, {"lr": 0.1, "loss": "hinge"}, 0.5)
+    _write(tmp_path, 1, {"lr": 0.2}, 0.75, formats.FORMAT_ZSTD)
+    _write(tmp_path, 2, {"lr": 0.3, "loss": "log"}, 0.25, formats.FORMAT_MSGPACK)
+    (tmp_path / "notes.txt").write_text("not a document")
+    yield tmp_path
+    store.get_run_store(tmp_path).close()
+
+
+def test_scan(directory):
+    columns, summary = scanner.scan(directory, workers=1)
+    assert (summary.files, summary.parsed, summary.skipped) == (3, 3, 0)
+    order = np.argsort(columns["run_id"])
+    assert list(columns["run_id"][order]) == ["run0", "run1", "run2"]
+    np.testing.assert_array_equal(columns["param.lr"][order], [0.1, 0.2, 0.3])
+    assert list(columns["param.loss"][order]) == ["hinge", None, "log"]
+    np.testing.assert_array_equal(columns["metric.accuracy"][order], [0.5, 0.75, 0.25])
+
+    records = scanner.to_records(columns)
+    assert records.dtype["param.lr"] == np.float64
+    assert sorted(records["metric.accuracy"]) == [0.25, 0.5, 0.75]
+
+    selected, _ = scanner.scan(directory, hyperparameters=["lr"], metrics=[])
+    assert sorted(selected) == ["algorithm", "param.lr", "path", "run_id", "version"]
+
+
+def test_reindex_skips_unchanged(directory):
+    scanner.reindex(directory, workers=1)
+    summary = scanner.reindex(directory, workers=1)
+    assert (summary.parsed, summary.skipped) == (0, 3)
+
+    path = _write(directory, 1, {"lr": 0.5}, 0.9)
+    os.utime(str(path), (1, 1))
+    (directory / "0.jsonld").unlink()
+    (directory / "3.jsonld").write_text('{"@id": ')
+    summary = scanner.reindex(directory, workers=1)
+    assert (summary.files, summary.parsed, summary.failed, summary.removed) == (4, 1, 1, 1)
+    columns = scanner.table(store.get_run_store(directory))
+    assert sorted(columns["param.lr"]) == [0.2, 0.3, 0.5]
+
+
+def test_reindex_process_pool(directory):
+    for index in range(3, 40):
+        _write(directory, index, {"lr": index / 100}, 0.5)
+    calls = []
+    summary = scanner.reindex(
+        directory, workers=2, chunksize=8, progress=lambda *args: calls.append(args)
+    )
+    assert summary.parsed == 40
+    assert [done for done, _, _ in calls] == [8, 16, 24, 32, 40]
+    assert len(store.get_run_store(directory)) == 40
+
+
+def test_reindex_bulk_insert(directory):
+    run_store = store.get_run_store(directory)
+    summary = scanner.reindex(directory, run_store, workers=1, bulk_threshold=2)
+    assert summary.parsed == 3
+    indexes = {
+        name for name, in run_store._connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+        )
+    }
+    assert set(store._INDEX_NAMES) <= indexes
+    assert [r["run_id"] for r in run_store.query(params={"lr": (">", 0.25)})] == ["run2"]
+
+    summary = scanner.reindex(directory, run_store, workers=1, full=True, bulk_threshold=2)
+    assert len(run_store) == 3
+    summary = scanner.reindex(directory, run_store, workers=1)
+    assert summary.parsed == 0 and summary.files_per_second > 0
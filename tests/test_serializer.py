@@ -0,0 +1,144 @@
+import itertools
+
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression, RidgeCV
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+from scipy.stats import uniform
+
+from mlsconverters import serializer
+from mlsconverters.models import (Algorithm, EvaluationMeasure, HyperParameter,
+                                  HyperParameterSetting, Implementation,
+                                  ModelEvaluation, Run, RunSchema)
+from mlsconverters.sklearn import to_run
+
+
+def _parity(run):
+    expected = RunSchema().dumps(run)
+    assert serializer.dumps(run, engine=serializer.ENGINE_COMPILED) == expected
+    assert serializer.dump(run, engine=serializer.ENGINE_COMPILED) == RunSchema().dump(run)
+    assert "".join(serializer.iter_dumps(run)) == expected
+
+
+@pytest.mark.parametrize("sklearn_model", [
+    LogisticRegression(random_state=0),
+    RidgeCV(alphas=[1e-3, 1e-2, 1e-1, 1]),
+    SVC(gamma=2, C=1),
+    RandomForestClassifier(max_depth=5, n_estimators=10, max_features=1),
+    RandomizedSearchCV(
+        LogisticRegression(solver='saga', tol=1e-2, max_iter=200, random_state=0),
+        dict(C=uniform(loc=0, scale=4), penalty=['l2', 'l1']),
+        random_state=0
+    ),
+    GridSearchCV(SVC(), {'kernel': ('linear', 'rbf'), 'C': [1, 10]}),
+    Pipeline([('scale', StandardScaler()), ('svc', SVC(kernel='linear'))]),
+])
+def test_compiled_parity_sklearn(sklearn_model):
+    sklearn_model.fit(
+        [[i+j, i+j] for i, j in itertools.product(range(5), range(3))],
+        list(itertools.chain.from_iterable(itertools.repeat([0, 1, 2], 5)))
+    )
+    _parity(to_run(sklearn_model, evaluation_measure=(accuracy_score, 0.5)))
+
+
+def test_compiled_parity_session_run():
+    run = Run(1234, input_values=[], output_values=[])
+    run.realizes = Algorithm("my_algo")
+    params = []
+    for k, v in {"a": 1, "b": 0.5, "c": "x", "d": True, "e": None, "f": [1, 2],
+                 "g": float("nan"), "h": float("-inf"), "\u00e9": {"k": "\u00fc"}}.items():
+        hp = HyperParameter(k, model_hash=run._id)
+        params.append(hp)
+        run.input_values.append(HyperParameterSetting(v, hp, model_hash=run._id))
+    run.output_values.append(
+        ModelEvaluation("http://www.w3.org/ns/mls#ModelEvaluation.1", 0.9,
+                        EvaluationMeasure("http://www.w3.org/ns/mls#accuracy"))
+    )
+    run.output_values.append(
+        ModelEvaluation("http://www.w3.org/ns/mls#ModelEvaluation.2", 0.1,
+                        EvaluationMeasure("http://www.w3.org/ns/mls#loss"), step=3)
+    )
+    run.executes = Implementation("impl", params, implements=run.realizes)
+    _parity(run)
+
+
+def test_compiled_blank_node_id():
+    data = serializer.dump(Run(None), engine=serializer.ENGINE_COMPILED)
+    assert data["@id"].startswith("_:")
+    assert list(data) == list(RunSchema().dump(Run(None)))
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        serializer.set_engine("nope")
+
+
+def test_schema_registry_shares_instances():
+    from concurrent.futures import ThreadPoolExecutor
+    from mlsconverters.models import clear_schema_registry, get_schema
+
+    clear_schema_registry()
+    with ThreadPoolExecutor(8) as pool:
+        schemas = list(pool.map(lambda _: get_schema(RunSchema), range(32)))
+    assert all(s is schemas[0] for s in schemas)
+    assert get_schema(RunSchema, only=("_id",)) is not schemas[0]
+
+    run = to_run(LogisticRegression())
+    assert get_schema(RunSchema).dumps(run) == RunSchema().dumps(run)
+    assert get_schema(RunSchema).dumps(run) == RunSchema().dumps(run)
+
+
+def test_compact_models():
+    hp = HyperParameter("".join(["lear", "ning_rate"]), model_hash=1)
+    setting = HyperParameterSetting(0.1, hp, model_hash=1)
+    assert hp._id == "http://www.w3.org/ns/mls#HyperParameter.learning_rate.1"
+    assert setting._id == (
+        "http://www.w3.org/ns/mls#HyperParameterSetting.learning_rate.1"
+    )
+    assert hp.label is HyperParameter("learning_rate", model_hash=2).label
+    algo = Algorithm("algo")
+    assert algo.label == "algo"
+    evaluation = ModelEvaluation("e", 0.5, EvaluationMeasure("m"))
+    run = Run(1, executes=Implementation("impl", [hp], implements=algo))
+    for node in (hp, setting, algo, evaluation, run, run.executes):
+        assert not hasattr(node, "__dict__")
+    assert "http://www.w3.org/ns/mls#step" not in RunSchema().dump(
+        Run(1, output_values=[evaluation])
+    )["http://www.w3.org/ns/mls#hasOutput"][0]
+
+
+def test_dump_to_streams(tmp_path):
+    import gzip
+    import io
+
+    hp = HyperParameter("a", model_hash=1)
+    measure = EvaluationMeasure("http://www.w3.org/ns/mls#loss")
+
+    def run(lazy=True):
+        outputs = (
+            ModelEvaluation("e.{}".format(i), 1.0 / i, measure, step=i)
+            for i in range(1, 100)
+        )
+        return Run(
+            1,
+            executes=Implementation("impl", [hp]),
+            input_values=[HyperParameterSetting(1, hp, model_hash=1)],
+            output_values=outputs if lazy else list(outputs),
+        )
+
+    expected = RunSchema().dumps(run(lazy=False))
+
+    text = io.StringIO()
+    serializer.dump_to(run(), text)
+    assert text.getvalue() == expected
+
+    with gzip.open(str(tmp_path / "run.jsonld.gz"), "wb") as f:
+        serializer.dump_to(run(), f)
+    with gzip.open(str(tmp_path / "run.jsonld.gz"), "rt") as f:
+        assert f.read() == expected
+
+    assert "".join(serializer.iter_dumps(Run(None))).startswith('{"@id": "_:')
@@ -0,0 +1,133 @@
+import json
+import multiprocessing
+import threading
+
+import pytest
+
+from mlsconverters import Session, io
+
+MLS = "http://www.w3.org/ns/mls#"
+
+
+class _Documents:
+    def __init__(self, path):
+        self.path = path
+
+    def __getitem__(self, hash):
+        return json.loads((self.path / (hash + ".jsonld")).read_text())
+
+
+@pytest.fixture
+def logged(tmp_path):
+    io.set_mls_dir(tmp_path)
+    yield _Documents(tmp_path)
+    io.set_mls_dir(None)
+
+
+def _outputs(document):
+    return [
+        (o[MLS + "specifiedBy"]["@id"][len(MLS):], o[MLS + "step"], o[MLS + "hasValue"])
+        for o in document[MLS + "hasOutput"]
+    ]
+
+
+def test_log_metrics_series(logged):
+    with Session("SGD", run_id=7) as s:
+        s.param("lr", 0.1)
+        for step in range(3):
+            s.log_metrics({"loss": 1.0 / (step + 1)})
+        s.log_metrics({"accuracy": 0.9}, step=10)
+    assert _outputs(logged["7"]) == [
+        ("loss", 0, 1.0),
+        ("loss", 1, 0.5),
+        ("loss", 2, 1.0 / 3),
+        ("accuracy", 10, 0.9),
+    ]
+    # the streamed metric nodes are kept
+    assert [o.value for o in s._run.output_values] == [1.0, 0.5, 1.0 / 3, 0.9]
+
+
+@pytest.mark.parametrize(
+    "aggregation, expected",
+    [("last", (4, 2.0)), ("min", (1, 0.5)), ("max", (2, 5.0))],
+)
+def test_log_metrics_aggregation(logged, aggregation, expected):
+    with Session("SGD", run_id=7, aggregation=aggregation) as s:
+        for value in (1.0, 0.5, 5.0, float("nan"), 2.0):
+            s.log_metrics({"loss": value})
+    assert _outputs(logged["7"]) == [("loss",) + expected]
+
+
+def test_log_metrics_downsampled(logged):
+    with Session("SGD", run_id=7, max_points=5) as s:
+        for step in range(101):
+            s.log_metrics({"loss": float(step)})
+    assert [step for _, step, _ in _outputs(logged["7"])] == [0, 25, 50, 75, 100]
+
+
+def test_unknown_aggregation():
+    with pytest.raises(ValueError):
+        Session("SGD", aggregation="mean")
+
+
+def test_runs_do_not_share_values():
+    from mlsconverters.models import Run
+
+    assert Run(1).input_values is not Run(2).input_values
+    assert Run(1).output_values is not Run(2).output_values
+
+
+def test_threads_log_to_one_run(logged):
+    with Session("SGD", run_id=7) as s:
+
+        def trial(i):
+            s.param("p{}".format(i), i)
+            for _ in range(100):
+                s.log_metrics({"loss": float(i)})
+
+        threads = [threading.Thread(target=trial, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    document = logged["7"]
+    assert len(document[MLS + "hasInput"]) == 4
+    outputs = _outputs(document)
+    assert len(outputs) == 400
+    assert sorted(value for _, _, value in outputs) == sorted(
+        float(i) for i in range(4) for _ in range(100)
+    )
+    ids = [o["@id"] for o in document[MLS + "hasOutput"]]
+    assert len(set(ids)) == len(ids)
+
+
+def _remote_trial(args):
+    remote, i = args
+    with remote:
+        remote.param("p{}".format(i), i)
+        remote.log_metrics({"loss": float(i)})
+        remote.log_metrics({"loss": float(i) / 2})
+        remote.metric("accuracy", i / 10)
+
+
+def test_child_processes_log_to_one_run(logged):
+    with Session("SGD", run_id=7) as s:
+        remote = s.remote()
+        with multiprocessing.Pool(2) as pool:
+            pool.map(_remote_trial, [(remote, i) for i in range(3)])
+        s.param("parent", True)
+
+    document = logged["7"]
+    labels = {
+        i[MLS + "specifiedBy"]["@id"][len(MLS):].split(".")[1]
+        for i in document[MLS + "hasInput"]
+    }
+    assert labels == {"p0", "p1", "p2", "parent"}
+    outputs = document[MLS + "hasOutput"]
+    values = {"loss": [], "accuracy": []}
+    for o in outputs:
+        values[o[MLS + "specifiedBy"]["@id"][len(MLS):]].append(o[MLS + "hasValue"])
+    assert sorted(values["loss"]) == [0.0, 0.0, 0.5, 1.0, 1.0, 2.0]
+    assert sorted(values["accuracy"]) == [0.0, 0.1, 0.2]
+    assert len({o["@id"] for o in outputs}) == len(outputs)
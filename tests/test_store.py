@@ -0,0 +1,90 @@
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.svm import SVC
+
+import mlsconverters
+from mlsconverters import Session, io, store
+
+
+@pytest.fixture
+def run_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "_stores", {})
+    io.set_mls_dir(tmp_path)
+    io.enable_run_store()
+    yield store.get_run_store(tmp_path)
+    io.disable_run_store()
+    io.set_mls_dir(None)
+    store.get_run_store(tmp_path).close()
+
+
+def _export_forests(depths_and_scores):
+    # kept alive, documents are named by the object hash
+    models = [RandomForestClassifier(max_depth=depth) for depth, _ in depths_and_scores]
+    paths = {}
+    for model, (depth, score) in zip(models, depths_and_scores):
+        path = mlsconverters.export(
+            model, force=True, evaluation_measure=(accuracy_score, score)
+        )
+        paths[depth] = str(path)
+    return paths, models
+
+
+def test_query(run_store):
+    paths, models = _export_forests([(3, 0.95), (6, 0.8), (8, 0.97), (10, 0.92)])
+    svc = SVC(C=2)
+    mlsconverters.export(svc, force=True, evaluation_measure=(accuracy_score, 0.99))
+    assert len(run_store) == 5
+
+    runs = run_store.query(
+        algorithm="%RandomForest%",
+        params={"max_depth": (">", 5)},
+        metrics={"accuracy": (">", 0.9)},
+        order_by="accuracy",
+    )
+    assert [r["path"] for r in runs] == [paths[8], paths[10]]
+    assert runs[0]["value"] == 0.97
+    assert runs[0]["algorithm"].endswith("RandomForestClassifier")
+
+    best = run_store.query(order_by="accuracy", limit=2)
+    assert [r["value"] for r in best] == [0.99, 0.97]
+    assert [r["value"] for r in run_store.query(order_by="accuracy", descending=False,
+                                                limit=1)] == [0.8]
+    assert len(run_store.query(params={"criterion": "gini"})) == 4
+    assert len(run_store.query(params={"bootstrap": True, "max_depth": 3})) == 1
+    assert run_store.query(params={"max_depth": None}) == []
+    assert run_store.hyperparameters(paths[3])["max_depth"] == 3
+    with pytest.raises(ValueError):
+        run_store.query(params={"max_depth": ("~", 1)})
+
+
+def test_session_indexed(run_store):
+    with Session("SGD", run_id="s1") as s:
+        s.param("lr", 0.1)
+        for step in range(3):
+            s.log_metrics({"loss": 1.0 / (step + 1)})
+    runs = run_store.query(algorithm="SGD", order_by="loss")
+    assert [(r["run_id"], r["value"]) for r in runs] == [("s1", 1.0 / 3)]
+    assert run_store.query(params={"lr": ("<", 0.5)})[0]["run_id"] == "s1"
+
+
+def test_rebuild(run_store, tmp_path):
+    io.disable_run_store()
+    paths, models = _export_forests([(3, 0.5), (4, 0.6)])
+    assert len(run_store) == 0
+    assert run_store.rebuild(tmp_path) == 2
+    assert run_store.rebuild(tmp_path) == 0
+    assert run_store.rebuild(tmp_path, full=True) == 2
+    assert len(run_store) == 2
+
+    (tmp_path / paths[3]).unlink()
+    assert run_store.rebuild(tmp_path) == 0
+    assert [r["path"] for r in run_store.query()] == [paths[4]]
+
+
+def test_rebuild_command(run_store, tmp_path, capsys):
+    io.disable_run_store()
+    _export_forests([(3, 0.5)])
+    store.main([str(tmp_path)])
+    assert "indexed 1 documents" in capsys.readouterr().out
+    assert len(run_store) == 1